@@ -0,0 +1,177 @@
+# File: arcsight_cache.py
+# Copyright (c) 2017-2026 Splunk Inc.
+#
+# Licensed under Apache 2.0 (https://www.apache.org/licenses/LICENSE-2.0.txt)
+#
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def _write_json(path, value):
+    """Write the JSON of a value to a unique temporary file next to 'path' and move it into place, so a reader never sees a partial file."""
+
+    f = tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path) or ".", suffix=".tmp", delete=False)
+
+    try:
+        with f:
+            json.dump(value, f)
+        os.replace(f.name, path)
+    except BaseException:
+        try:
+            os.remove(f.name)
+        except OSError:
+            pass
+        raise
+
+
+class LRUCache:
+    """
+    Thread-safe least recently used cache with a maximum number of entries.
+
+    The cache counts its hits and misses, and can be saved to and loaded from a JSON file
+    so that it outlives a single action run.
+    """
+
+    def __init__(self, max_entries):
+
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+
+        return len(self._entries)
+
+    def get_many(self, keys):
+        """
+        Look up many keys at once.
+
+        :return: dictionary of the keys found to their values, list of the keys that were not found
+        """
+        found = {}
+        missing = []
+
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                else:
+                    missing.append(key)
+
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        return found, missing
+
+    def put_many(self, items):
+
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def load(self, path):
+        """Load the entries saved by 'save', a missing or unreadable file leaves the cache empty."""
+
+        try:
+            with open(path) as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        self.put_many(items)
+
+        return True
+
+    def save(self, path):
+
+        with self._lock:
+            items = list(self._entries.items())
+
+        # concurrent action runs save the same cache, each writes a temporary file of its own
+        _write_json(path, items)
+
+
+class DirectoryCache:
+    """
+    Least recently used cache that keeps each entry in a JSON file of its own, in a directory.
+
+    A lookup reads only the file of its key and a store writes only the file of its key, so a large entry
+    is not read or written again by the runs that use the other entries. Beyond 'max_entries' files, the
+    least recently used ones are deleted, a hit refreshes the modification time of its file.
+    """
+
+    def __init__(self, directory, max_entries):
+
+        self._directory = directory
+        self._max_entries = max_entries
+
+    def _get_path(self, key):
+
+        return os.path.join(self._directory, f"{hashlib.sha256(key.encode()).hexdigest()}.json")
+
+    def get(self, key):
+        """:return: the value of the key, None when it is not cached or its file is unreadable"""
+
+        path = self._get_path(key)
+
+        try:
+            with open(path) as f:
+                cached_key, value = json.load(f)
+        except (OSError, ValueError, TypeError):
+            return None
+
+        if cached_key != key:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return value
+
+    def put(self, key, value):
+
+        os.makedirs(self._directory, exist_ok=True)
+
+        _write_json(self._get_path(key), [key, value])
+
+        self._evict()
+
+    def _evict(self):
+
+        entries = []
+        with os.scandir(self._directory) as dir_entries:
+            for entry in dir_entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    # deleted by a concurrent action run
+                    continue
+
+        entries.sort()
+
+        for _, path in entries[: max(len(entries) - self._max_entries, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
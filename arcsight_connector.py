@@ -5,20 +5,48 @@
 #
 
 # Phantom imports
+import asyncio
+import fcntl
+import hashlib
 import json
+import os
+import random
 import re
 import socket
 import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 
+import encryption_helper
 import phantom.app as phantom
 import requests
 from bs4 import BeautifulSoup
 from phantom.action_result import ActionResult
 from phantom.base_connector import BaseConnector
+from requests.adapters import HTTPAdapter
 
 # THIS Connector imports
+from arcsight_cache import DirectoryCache, LRUCache
 from arcsight_consts import *
+from arcsight_metrics import Metrics
+from arcsight_policy import CircuitBreaker, TokenBucket
+from arcsight_replay import Recorder, Replayer
+
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 _container_common = {}
@@ -44,36 +72,46 @@ def _validate_range(input_range, action_result):
     return phantom.APP_SUCCESS
 
 
+@lru_cache(maxsize=ARCSIGHT_CONVERSION_CACHE_SIZE)
 def _to_mac(input_mac):
 
     if not input_mac:
         return ""
 
-    input_mac = int(input_mac)
+    try:
+        input_mac = int(input_mac)
+    except ValueError:
+        # already formatted by the manager
+        return input_mac
 
     if input_mac == ARCSIGHT_64VAL_NOT_FILLED:
         return ""
 
-    hex_str = f"{input_mac:x}"
+    hex_str = f"{input_mac & 0xFFFFFFFFFFFF:012x}"
 
-    hex_str = hex_str[:12]
-
-    return ":".join(s.encode("hex") for s in hex_str.decode("hex"))
+    return ":".join(hex_str[i : i + 2] for i in range(0, 12, 2))
 
 
+@lru_cache(maxsize=ARCSIGHT_CONVERSION_CACHE_SIZE)
 def _to_ip(input_ip):
 
     if not input_ip:
         return ""
 
-    input_ip = int(input_ip)
+    try:
+        input_ip = int(input_ip)
+    except ValueError:
+        # already formatted by the manager
+        return input_ip
 
     if input_ip == ARCSIGHT_64VAL_NOT_FILLED:
         return ""
 
-    return socket.inet_ntoa(struct.pack("!L", input_ip))
+    # the manager sends the address as a signed 32 bit value
+    return socket.inet_ntoa(struct.pack("!L", input_ip & 0xFFFFFFFF))
 
 
+@lru_cache(maxsize=ARCSIGHT_CONVERSION_CACHE_SIZE)
 def _to_port(port):
 
     if not port:
@@ -87,6 +125,131 @@ def _to_port(port):
     return port
 
 
+# Mapping of the ESM event fields to CEF keys: (event section, field, CEF key, converter).
+# A section of None is a top level field of the event. When several fields map to the same CEF key,
+# the first non-empty value wins, so the attacker and target sections only fill what source and destination left empty.
+_CEF_MAPPING = (
+    ("source", "userName", "sourceUserName", None),
+    ("source", "userId", "sourceUserId", None),
+    ("source", "address", "sourceAddress", _to_ip),
+    ("source", "macAddress", "sourceMacAddress", _to_mac),
+    ("source", "maxAddress", "sourceMacAddress", _to_mac),
+    ("source", "port", "sourcePort", _to_port),
+    ("source", "hostName", "sourceHostName", None),
+    ("source", "ntDomain", "sourceNtDomain", None),
+    ("source", "processName", "sourceProcessName", None),
+    ("source", "translatedAddress", "sourceTranslatedAddress", _to_ip),
+    ("source", "translatedPort", "sourceTranslatedPort", _to_port),
+    ("attacker", "userName", "sourceUserName", None),
+    ("attacker", "userId", "sourceUserId", None),
+    ("attacker", "address", "sourceAddress", _to_ip),
+    ("attacker", "macAddress", "sourceMacAddress", _to_mac),
+    ("attacker", "port", "sourcePort", _to_port),
+    ("attacker", "hostName", "sourceHostName", None),
+    ("attacker", "ntDomain", "sourceNtDomain", None),
+    ("attacker", "processName", "sourceProcessName", None),
+    ("destination", "userName", "destinationUserName", None),
+    ("destination", "userId", "destinationUserId", None),
+    ("destination", "address", "destinationAddress", _to_ip),
+    ("destination", "macAddress", "destinationMacAddress", _to_mac),
+    ("destination", "maxAddress", "destinationMacAddress", _to_mac),
+    ("destination", "port", "destinationPort", _to_port),
+    ("destination", "hostName", "destinationHostName", None),
+    ("destination", "ntDomain", "destinationNtDomain", None),
+    ("destination", "processName", "destinationProcessName", None),
+    ("destination", "translatedAddress", "destinationTranslatedAddress", _to_ip),
+    ("destination", "translatedPort", "destinationTranslatedPort", _to_port),
+    ("target", "userName", "destinationUserName", None),
+    ("target", "userId", "destinationUserId", None),
+    ("target", "address", "destinationAddress", _to_ip),
+    ("target", "macAddress", "destinationMacAddress", _to_mac),
+    ("target", "port", "destinationPort", _to_port),
+    ("target", "hostName", "destinationHostName", None),
+    ("target", "ntDomain", "destinationNtDomain", None),
+    ("target", "processName", "destinationProcessName", None),
+    ("device", "address", "deviceAddress", _to_ip),
+    ("device", "macAddress", "deviceMacAddress", _to_mac),
+    ("device", "hostName", "deviceHostName", None),
+    ("device", "vendor", "deviceVendor", None),
+    ("device", "product", "deviceProduct", None),
+    ("device", "version", "deviceVersion", None),
+    ("device", "processName", "deviceProcessName", None),
+    ("device", "externalId", "deviceExternalId", None),
+    ("device", "inboundInterface", "deviceInboundInterface", None),
+    ("device", "outboundInterface", "deviceOutboundInterface", None),
+    ("agent", "address", "agentAddress", _to_ip),
+    ("agent", "macAddress", "agentMacAddress", _to_mac),
+    ("agent", "hostName", "agentHostName", None),
+    ("agent", "id", "agentId", None),
+    ("agent", "type", "agentType", None),
+    ("agent", "version", "agentVersion", None),
+    ("file", "name", "fileName", None),
+    ("file", "path", "filePath", None),
+    ("file", "id", "fileId", None),
+    ("file", "hash", "fileHash", None),
+    ("file", "size", "fileSize", None),
+    ("file", "type", "fileType", None),
+    ("file", "permission", "filePermission", None),
+    (None, "requestUrl", "requestURL", None),
+    (None, "requestMethod", "requestMethod", None),
+    (None, "requestClientApplication", "requestClientApplication", None),
+    (None, "requestCookies", "requestCookies", None),
+    (None, "requestContext", "requestContext", None),
+)
+
+
+def _compile_cef_mapping(mapping):
+    """
+    Group the mapping by event section, keeping the order in which the sections first appear.
+
+    Each field is flagged when an earlier field maps to the same CEF key, only those fields need to check
+    whether their key is already filled.
+    """
+
+    sections = {}
+    mapped_keys = set()
+    for section, field, cef_key, converter in mapping:
+        sections.setdefault(section, []).append((field, cef_key, converter, cef_key in mapped_keys))
+        mapped_keys.add(cef_key)
+
+    return tuple((section, tuple(fields)) for section, fields in sections.items())
+
+
+_CEF_TRANSFORM = _compile_cef_mapping(_CEF_MAPPING)
+
+
+def _event_to_cef(event):
+    """Build the CEF dictionary of an event from the compiled mapping, leaving out the empty values."""
+
+    cef = {}
+
+    for section, fields in _CEF_TRANSFORM:
+        values = event.get(section) if section else event
+        if not values or not isinstance(values, dict):
+            continue
+
+        get = values.get
+        for field, cef_key, converter, fallback in fields:
+            value = get(field)
+            if value is None or value == "":
+                continue
+
+            if fallback and cef_key in cef:
+                continue
+
+            if converter is not None:
+                try:
+                    value = converter(value)
+                except (TypeError, ValueError, OverflowError):
+                    continue
+
+            if value:
+                cef[cef_key] = value
+
+    return cef
+
+
+@lru_cache(maxsize=ARCSIGHT_CONVERSION_CACHE_SIZE)
 def _get_str_from_epoch(epoch_milli):
 
     if epoch_milli is None:
@@ -99,6 +262,130 @@ def _get_str_from_epoch(epoch_milli):
     return datetime.fromtimestamp(int(epoch_milli) / 1000.0).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
 
+def _get_case_hash(case_details):
+    """Hash of the case content that matters for ingestion, independent of the key and event ID order."""
+
+    content = {k: v for k, v in case_details.items() if k not in ARCSIGHT_CASE_HASH_IGNORED_FIELDS}
+
+    event_ids = content.get("eventIDs")
+    if isinstance(event_ids, (list, tuple)):
+        content["eventIDs"] = sorted(str(x) for x in event_ids)
+
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _get_group_uri(group):
+
+    if not group.startswith("/"):
+        group = f"/{group}"
+
+    return group.rstrip("/")
+
+
+def _get_child_id(resp):
+
+    try:
+        return resp.get("gro.getChildIDByChildNameOrAliasResponse", {}).get("gro.return", {})
+    except:
+        # If the case is not present, the response ....Response is not a dict
+        return None
+
+
+def _get_case_from_reply(resp):
+
+    try:
+        return resp.get("cas.getResourceByIdResponse", {}).get("cas.return", {})
+    except:
+        return {}
+
+
+def _get_inserted_case(resp):
+
+    try:
+        return resp.get("cas.insertResourceResponse", {}).get("cas.return", {})
+    except:
+        return {}
+
+
+def _is_per_case_update(update_fields):
+    """Whether 'update_fields' maps case IDs to the fields of each case, rather than holding the fields of all the cases."""
+
+    return bool(update_fields) and all(isinstance(fields, dict) for fields in update_fields.values())
+
+
+def _get_operation(endpoint):
+    """Name of the service and method of an endpoint, e.g. 'CaseService/getResourceById'."""
+
+    return "/".join(endpoint.rsplit("/", 2)[-2:])
+
+
+def _is_idempotent(endpoint):
+
+    return endpoint.rsplit("/", 1)[-1] in ARCSIGHT_IDEMPOTENT_OPERATIONS
+
+
+def _get_search_result(resp):
+    """Get the search result of a ManagerSearchService reply, with 'searchHits' always a list."""
+
+    try:
+        search_result = resp.get("mss.searchResponse", {}).get("mss.return", {})
+    except:
+        search_result = {}
+
+    if not isinstance(search_result, dict):
+        search_result = {}
+
+    search_hits = search_result.get("searchHits", [])
+
+    if not search_hits:
+        search_hits = []
+    elif not isinstance(search_hits, list):
+        search_hits = [search_hits]
+
+    search_result["searchHits"] = search_hits
+
+    return search_result
+
+
+def _replace_token(obj, old_token, new_token):
+    """Return a copy of the request params/body with every occurrence of old_token replaced by new_token."""
+
+    if isinstance(obj, dict):
+        return {k: _replace_token(v, old_token, new_token) for k, v in obj.items()}
+
+    if isinstance(obj, list):
+        return [_replace_token(v, old_token, new_token) for v in obj]
+
+    return new_token if obj == old_token else obj
+
+
+def _has_token(obj, token):
+
+    if isinstance(obj, dict):
+        return any(_has_token(v, token) for v in obj.values())
+
+    if isinstance(obj, list):
+        return any(_has_token(v, token) for v in obj)
+
+    return obj == token
+
+
+def _is_auth_error(response):
+
+    if response.status_code in ARCSIGHT_AUTH_ERROR_STATUS_CODES:
+        return True
+
+    if response.status_code == requests.codes.ok:  # pylint: disable=E1101
+        return False
+
+    try:
+        text = response.text
+    except:
+        return False
+
+    return any(marker in text for marker in ARCSIGHT_AUTH_ERROR_MARKERS)
+
+
 def _parse_error(response):
 
     pres = None
@@ -153,6 +440,43 @@ def _parse_error(response):
     return message
 
 
+def _loads(content):
+    """Parse a JSON reply from its raw bytes in one pass, with orjson when it is installed."""
+
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson only reads UTF-8, the stdlib parser also detects UTF-16 and UTF-32
+            pass
+
+    return json.loads(content)
+
+
+def _get_request_size(response):
+    """Bytes of the request body of a reply, 0 for a replayed reply."""
+
+    request = getattr(response, "request", None)
+
+    return len(request.body or b"") if request is not None else 0
+
+
+class _BufferedResponse:
+    """The parts of a requests response that are used to process a reply, for replies read with aiohttp."""
+
+    def __init__(self, status_code, headers, content, encoding=None):
+
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self):
+
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
 class ArcsightConnector(BaseConnector):
     def __init__(self):
 
@@ -161,16 +485,413 @@ class ArcsightConnector(BaseConnector):
 
         self._base_url = None
         self._auth_token = None
+        self._session = None
+        self._session_requests = 0
+        self._pool_size = ARCSIGHT_DEFAULT_POOL_SIZE
+        self._max_connection_reuse = ARCSIGHT_DEFAULT_MAX_CONNECTION_REUSE
+        self._token_ttl = ARCSIGHT_DEFAULT_TOKEN_TTL
+        self._max_concurrency = ARCSIGHT_DEFAULT_MAX_CONCURRENCY
+        self._event_batch_size = ARCSIGHT_DEFAULT_EVENT_BATCH_SIZE
+        self._artifact_batch_size = ARCSIGHT_DEFAULT_ARTIFACT_BATCH_SIZE
+        self._search_page_size = ARCSIGHT_DEFAULT_SEARCH_PAGE_SIZE
+        self._max_retries = ARCSIGHT_DEFAULT_MAX_RETRIES
+        self._retry_backoff = ARCSIGHT_DEFAULT_RETRY_BACKOFF
+        self._rate_limiter = None
+        self._circuit_breaker = CircuitBreaker(0, 0)
+        self._policy_lock = threading.Lock()
+        self._retries = 0
+        self._throttle_delay = 0
+        self._group_cache_ttl = ARCSIGHT_DEFAULT_GROUP_CACHE_TTL
+        self._child_index_ttl = ARCSIGHT_DEFAULT_CHILD_INDEX_TTL
+        self._minimal_update = False
+        self._debug_capture = ARCSIGHT_DEFAULT_DEBUG_CAPTURE
+        self._debug_capture_call_bytes = ARCSIGHT_DEFAULT_DEBUG_CAPTURE_CALL_BYTES
+        self._debug_capture_action_bytes = ARCSIGHT_DEFAULT_DEBUG_CAPTURE_ACTION_BYTES
+        self._debug_lock = threading.Lock()
+        self._debug_bytes = 0
+        self._debug_capped = False
+        self._metrics = None
+        self._metrics_file = None
+        self._async_transport = False
+        self._recorder = None
+        self._replayer = None
+        self._max_async_requests = ARCSIGHT_DEFAULT_MAX_ASYNC_REQUESTS
+        self._async_loop = None
+        self._async_thread = None
+        self._async_session = None
+        self._async_semaphore = None
+        self._query_cache_ttl = ARCSIGHT_DEFAULT_QUERY_CACHE_TTL
+        self._query_cache_size = ARCSIGHT_DEFAULT_QUERY_CACHE_SIZE
+        self._case_cache_ttl = ARCSIGHT_DEFAULT_CASE_CACHE_TTL
+        self._case_cache = None
+        self._case_index = None
+        self._event_cache = None
+        self._persist_event_cache = False
+        self._session_lock = threading.Lock()
+        self._request_semaphore = None
+        self._state = {}
+        self._changed_state_keys = set()
 
     def initialize(self):
 
+        self._state = self.load_state()
+        if not isinstance(self._state, dict):
+            self.debug_print(ARCSIGHT_ERR_STATE_FILE_CORRUPT)
+            self._state = {}
+            self._set_state("app_version", self.get_app_json().get("app_version"))
+
         # Base URL
         config = self.get_config()
 
         self._base_url = config[ARCSIGHT_JSON_BASE_URL].rstrip("/")
 
+        ret_val, self._pool_size = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_POOL_SIZE, ARCSIGHT_DEFAULT_POOL_SIZE), ARCSIGHT_JSON_POOL_SIZE
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._max_connection_reuse = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_MAX_CONNECTION_REUSE, ARCSIGHT_DEFAULT_MAX_CONNECTION_REUSE), ARCSIGHT_JSON_MAX_CONNECTION_REUSE, True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._token_ttl = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_TOKEN_TTL, ARCSIGHT_DEFAULT_TOKEN_TTL), ARCSIGHT_JSON_TOKEN_TTL, True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._max_concurrency = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_MAX_CONCURRENCY, ARCSIGHT_DEFAULT_MAX_CONCURRENCY), ARCSIGHT_JSON_MAX_CONCURRENCY
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        # caps the requests in flight to the manager, however many worker pools are running
+        self._request_semaphore = threading.BoundedSemaphore(self._max_concurrency)
+
+        ret_val, self._event_batch_size = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_EVENT_BATCH_SIZE, ARCSIGHT_DEFAULT_EVENT_BATCH_SIZE), ARCSIGHT_JSON_EVENT_BATCH_SIZE
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._artifact_batch_size = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_ARTIFACT_BATCH_SIZE, ARCSIGHT_DEFAULT_ARTIFACT_BATCH_SIZE), ARCSIGHT_JSON_ARTIFACT_BATCH_SIZE
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, event_cache_size = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_EVENT_CACHE_SIZE, ARCSIGHT_DEFAULT_EVENT_CACHE_SIZE), ARCSIGHT_JSON_EVENT_CACHE_SIZE, True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        if event_cache_size:
+            self._event_cache = LRUCache(event_cache_size)
+            self._persist_event_cache = config.get(ARCSIGHT_JSON_PERSIST_EVENT_CACHE, False)
+
+        ret_val, self._search_page_size = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_SEARCH_PAGE_SIZE, ARCSIGHT_DEFAULT_SEARCH_PAGE_SIZE), ARCSIGHT_JSON_SEARCH_PAGE_SIZE
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._query_cache_ttl = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_QUERY_CACHE_TTL, ARCSIGHT_DEFAULT_QUERY_CACHE_TTL), ARCSIGHT_JSON_QUERY_CACHE_TTL, True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._query_cache_size = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_QUERY_CACHE_SIZE, ARCSIGHT_DEFAULT_QUERY_CACHE_SIZE), ARCSIGHT_JSON_QUERY_CACHE_SIZE
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._max_async_requests = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_MAX_ASYNC_REQUESTS, ARCSIGHT_DEFAULT_MAX_ASYNC_REQUESTS), ARCSIGHT_JSON_MAX_ASYNC_REQUESTS
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._max_retries = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_MAX_RETRIES, ARCSIGHT_DEFAULT_MAX_RETRIES), ARCSIGHT_JSON_MAX_RETRIES, True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._retry_backoff = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_RETRY_BACKOFF, ARCSIGHT_DEFAULT_RETRY_BACKOFF), ARCSIGHT_JSON_RETRY_BACKOFF, True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, rate_limit = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_RATE_LIMIT, ARCSIGHT_DEFAULT_RATE_LIMIT), ARCSIGHT_JSON_RATE_LIMIT, True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        if rate_limit:
+            rate_limit_path = os.path.join(self.get_state_dir(), ARCSIGHT_RATE_LIMIT_FILE.format(asset_id=self.get_asset_id()))
+            self._rate_limiter = TokenBucket(rate_limit_path, rate_limit)
+
+        ret_val, circuit_breaker_threshold = self._validate_integer(
+            self,
+            config.get(ARCSIGHT_JSON_CIRCUIT_BREAKER_THRESHOLD, ARCSIGHT_DEFAULT_CIRCUIT_BREAKER_THRESHOLD),
+            ARCSIGHT_JSON_CIRCUIT_BREAKER_THRESHOLD,
+            True,
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, circuit_breaker_timeout = self._validate_integer(
+            self,
+            config.get(ARCSIGHT_JSON_CIRCUIT_BREAKER_TIMEOUT, ARCSIGHT_DEFAULT_CIRCUIT_BREAKER_TIMEOUT),
+            ARCSIGHT_JSON_CIRCUIT_BREAKER_TIMEOUT,
+            True,
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        # the circuit stays open across action runs
+        circuit_state = self._state.get(ARCSIGHT_STATE_CIRCUIT_BREAKER)
+        if not isinstance(circuit_state, dict):
+            circuit_state = {}
+        self._circuit_breaker = CircuitBreaker(
+            circuit_breaker_threshold, circuit_breaker_timeout, circuit_state.get("failures", 0), circuit_state.get("open_until", 0)
+        )
+
+        ret_val, self._group_cache_ttl = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_GROUP_CACHE_TTL, ARCSIGHT_DEFAULT_GROUP_CACHE_TTL), ARCSIGHT_JSON_GROUP_CACHE_TTL, True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._child_index_ttl = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_CHILD_INDEX_TTL, ARCSIGHT_DEFAULT_CHILD_INDEX_TTL), ARCSIGHT_JSON_CHILD_INDEX_TTL, True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        self._minimal_update = config.get(ARCSIGHT_JSON_MINIMAL_UPDATE, False)
+
+        self._debug_capture = config.get(ARCSIGHT_JSON_DEBUG_CAPTURE, ARCSIGHT_DEFAULT_DEBUG_CAPTURE).lower()
+        if self._debug_capture not in ARCSIGHT_DEBUG_CAPTURE_LEVELS:
+            return self.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_INVALID_DEBUG_CAPTURE.format(levels=", ".join(ARCSIGHT_DEBUG_CAPTURE_LEVELS)))
+
+        ret_val, self._debug_capture_call_bytes = self._validate_integer(
+            self,
+            config.get(ARCSIGHT_JSON_DEBUG_CAPTURE_CALL_BYTES, ARCSIGHT_DEFAULT_DEBUG_CAPTURE_CALL_BYTES),
+            ARCSIGHT_JSON_DEBUG_CAPTURE_CALL_BYTES,
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        ret_val, self._debug_capture_action_bytes = self._validate_integer(
+            self,
+            config.get(ARCSIGHT_JSON_DEBUG_CAPTURE_ACTION_BYTES, ARCSIGHT_DEFAULT_DEBUG_CAPTURE_ACTION_BYTES),
+            ARCSIGHT_JSON_DEBUG_CAPTURE_ACTION_BYTES,
+            True,
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        if config.get(ARCSIGHT_JSON_COLLECT_METRICS, True):
+            self._metrics = Metrics()
+            self._metrics_file = config.get(ARCSIGHT_JSON_METRICS_FILE)
+
+        ret_val, self._case_cache_ttl = self._validate_integer(
+            self, config.get(ARCSIGHT_JSON_CASE_CACHE_TTL, ARCSIGHT_DEFAULT_CASE_CACHE_TTL), ARCSIGHT_JSON_CASE_CACHE_TTL, True
+        )
+        if phantom.is_fail(ret_val):
+            return self.get_status()
+
+        replay_mode = config.get(ARCSIGHT_JSON_REPLAY_MODE, ARCSIGHT_REPLAY_OFF).lower()
+        if replay_mode not in ARCSIGHT_REPLAY_MODES:
+            return self.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_INVALID_REPLAY_MODE.format(modes=", ".join(ARCSIGHT_REPLAY_MODES)))
+
+        replay_path = os.path.join(
+            self.get_state_dir(), config.get(ARCSIGHT_JSON_REPLAY_FILE) or ARCSIGHT_REPLAY_FILE.format(asset_id=self.get_asset_id())
+        )
+        if replay_mode == ARCSIGHT_REPLAY_RECORD:
+            self._recorder = Recorder(replay_path)
+        elif replay_mode == ARCSIGHT_REPLAY_REPLAY:
+            try:
+                self._replayer = Replayer(replay_path, config.get(ARCSIGHT_JSON_REPLAY_TIMING, False))
+            except (OSError, EOFError, ValueError, KeyError) as e:
+                error_msg = self._get_error_message_from_exception(e)
+                return self.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_REPLAY_FILE.format(path=replay_path, error=error_msg))
+
+        if config.get(ARCSIGHT_JSON_ASYNC_TRANSPORT, False):
+            if aiohttp is None:
+                self.debug_print(ARCSIGHT_ERR_ASYNC_TRANSPORT_UNAVAILABLE)
+            elif replay_mode != ARCSIGHT_REPLAY_OFF:
+                self.debug_print(ARCSIGHT_MSG_REPLAY_NO_ASYNC_TRANSPORT)
+            else:
+                self._async_transport = True
+
+        return phantom.APP_SUCCESS
+
+    def finalize(self):
+
+        self._set_state(
+            ARCSIGHT_STATE_CIRCUIT_BREAKER,
+            {
+                "failures": self._circuit_breaker.failures,
+                "open_until": self._circuit_breaker.open_until,
+            },
+        )
+
+        self._save_state()
+
+        if self._metrics is not None and self._metrics_file:
+            self._save_metrics()
+
+        if self._case_cache is not None:
+            try:
+                self._case_cache.save(self._get_case_cache_path())
+            except OSError as e:
+                self.debug_print(f"Unable to save the case cache: {self._get_error_message_from_exception(e)}")
+
+        if self._recorder is not None:
+            self._recorder.close()
+
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+        self._close_async_loop()
+
         return phantom.APP_SUCCESS
 
+    def _set_state(self, key, value):
+
+        self._state[key] = value
+        self._changed_state_keys.add(key)
+
+    def _pop_state(self, key):
+
+        self._state.pop(key, None)
+        self._changed_state_keys.add(key)
+
+    def _save_state(self):
+        """
+        Save the keys of the state that this run changed.
+
+        Concurrent action runs of the asset each load the state once, so the state is read again under a lock file
+        and only the changed keys are written over it. Otherwise a run would put back the stale values of the keys
+        that another run saved meanwhile, e.g. the case index of an on poll.
+        """
+        lock_path = os.path.join(self.get_state_dir(), ARCSIGHT_STATE_LOCK_FILE.format(asset_id=self.get_asset_id()))
+
+        try:
+            with open(lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    state = self.load_state()
+                    if not isinstance(state, dict):
+                        state = {}
+
+                    for key in self._changed_state_keys:
+                        if key in self._state:
+                            state[key] = self._state[key]
+                        else:
+                            state.pop(key, None)
+
+                    self.save_state(state)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except OSError as e:
+            self.debug_print(f"Unable to lock the state, saving it without the lock. {self._get_error_message_from_exception(e)}")
+            self.save_state(self._state)
+
+    def _save_metrics(self):
+        """Append the metrics of the action run as one JSON line to the metrics file, relative paths are in the state directory."""
+
+        metrics_path = os.path.join(self.get_state_dir(), self._metrics_file)
+
+        record = {
+            "timestamp": time.time(),
+            "asset_id": self.get_asset_id(),
+            "action": self.get_action_identifier(),
+            "metrics": self._metrics.report(),
+        }
+
+        try:
+            with open(metrics_path, "a") as f:
+                f.write(f"{json.dumps(record)}\n")
+        except OSError as e:
+            self.debug_print(f"Unable to write the metrics file: {self._get_error_message_from_exception(e)}")
+
+    def _record(self, operation, started, bytes_sent=0, bytes_received=0, error=False):
+
+        if self._metrics is not None:
+            self._metrics.record(operation, time.monotonic() - started, bytes_sent, bytes_received, error)
+
+    def _validate_integer(self, action_result, parameter, key, allow_zero=False):
+        """
+        Validate that the given parameter is a positive integer (or non-negative if allow_zero is set).
+
+        :param action_result: object of ActionResult (or the connector itself) to set the status on
+        :param parameter: value to validate
+        :param key: name of the parameter, used in the error message
+        :param allow_zero: whether zero is a valid value
+        :return: status success/failure, integer value of the parameter
+        """
+        if parameter is None:
+            return phantom.APP_SUCCESS, parameter
+
+        try:
+            if not float(parameter).is_integer():
+                return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_INVALID_INT.format(key=key)), None
+            parameter = int(parameter)
+        except:
+            return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_INVALID_INT.format(key=key)), None
+
+        if parameter < 0:
+            return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_NEGATIVE_INT.format(key=key)), None
+
+        if not allow_zero and parameter == 0:
+            return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_NON_ZERO_INT.format(key=key)), None
+
+        return phantom.APP_SUCCESS, parameter
+
+    def _get_session(self):
+        """
+        Return the pooled keep-alive session used for every call to the ESM manager.
+
+        The session (and with it every pooled connection) is recycled once it has served
+        'max_connection_reuse' requests, a value of 0 keeps the connections for the whole action run.
+        """
+        with self._session_lock:
+            if self._session is not None and self._max_connection_reuse and self._session_requests >= self._max_connection_reuse:
+                self.debug_print(f"Recycling the connection pool after {self._session_requests} requests")
+                self._session.close()
+                self._session = None
+
+            if self._session is None:
+                config = self.get_config()
+
+                session = requests.Session()
+                # every worker thread needs a connection of its own
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self._pool_size, self._max_concurrency))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.verify = config[phantom.APP_JSON_VERIFY]
+                session.headers.update({"Accept": "application/json", "Connection": "keep-alive"})
+
+                self._session = session
+                self._session_requests = 0
+
+            self._session_requests += 1
+
+            return self._session
+
     def _get_error_message_from_exception(self, e):
         """
         Get appropriate error message from the exception.
@@ -234,95 +955,386 @@ class ArcsightConnector(BaseConnector):
 
         self.save_progress("Version validation done")
 
+        self._set_state(ARCSIGHT_STATE_ESM_VERSION, device_version)
+        self._set_state(ARCSIGHT_STATE_ESM_VERSION_TIMESTAMP, time.time())
+
         return phantom.APP_SUCCESS
 
-    def _login(self, action_result):
+    def _is_cache_fresh(self, timestamp, ttl=None):
 
-        if self._auth_token is not None:
-            return phantom.APP_SUCCESS
+        if ttl is None:
+            ttl = self._token_ttl
+
+        if not ttl or not timestamp:
+            return False
+
+        try:
+            return (time.time() - float(timestamp)) < ttl
+        except (TypeError, ValueError):
+            return False
+
+    def _get_auth_owner(self):
+        """Fingerprint of the manager and user a cached token was issued for, so a changed asset config never reuses it."""
 
         config = self.get_config()
 
-        self.save_progress("Logging into device/server")
+        return hashlib.sha256(f"{self._base_url}|{config[ARCSIGHT_JSON_USERNAME]}".encode()).hexdigest()
 
-        request_data = {"log.login": {"log.login": config[ARCSIGHT_JSON_USERNAME], "log.password": config[ARCSIGHT_JSON_PASSWORD]}}
+    @contextmanager
+    def _login_lock(self):
+        """Serialize logins of concurrent action runs on the same asset through an exclusive lock file in the state directory."""
 
-        ret_val, resp = self._make_rest_call(ACRSIGHT_LOGIN_ENDPOINT, action_result, json=request_data, method="post")
+        lock_path = os.path.join(self.get_state_dir(), ARCSIGHT_LOGIN_LOCK_FILE.format(asset_id=self.get_asset_id()))
 
-        if phantom.is_fail(ret_val):
-            return action_result.get_status()
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
 
-        # parse the response and set the auth key
-        try:
-            self._auth_token = resp["log.loginResponse"]["log.return"]
-        except Exception as e:
-            error_msg = self._get_error_message_from_exception(e)
-            self.debug_print(f"Handled exception while parsing auth token. {error_msg}")
-            return action_result.set_status(phantom.APP_ERROR, "Error parsing login response")
+    def _load_cached_auth(self, rejected_token=None, reload_state=False):
 
-        # validate the version
-        ret_val = self._validate_version(action_result)
-        if phantom.is_fail(ret_val):
-            return action_result.get_status()
+        if not self._token_ttl:
+            return None
 
-        return phantom.APP_SUCCESS
+        if reload_state:
+            # pick up a token that another action run on this asset may have saved meanwhile
+            disk_state = self.load_state()
+            if isinstance(disk_state, dict):
+                for key in (
+                    ARCSIGHT_STATE_AUTH_TOKEN,
+                    ARCSIGHT_STATE_AUTH_OWNER,
+                    ARCSIGHT_STATE_AUTH_TIMESTAMP,
+                    ARCSIGHT_STATE_ESM_VERSION,
+                    ARCSIGHT_STATE_ESM_VERSION_TIMESTAMP,
+                ):
+                    if key in disk_state:
+                        self._state[key] = disk_state[key]
 
-    def _get_version(self, action_result):
+        encrypted_token = self._state.get(ARCSIGHT_STATE_AUTH_TOKEN)
 
-        endpoint = f"{ARCSIGHT_CASESERVICE_ENDPOINT}/getESMVersion"
+        if not encrypted_token or self._state.get(ARCSIGHT_STATE_AUTH_OWNER) != self._get_auth_owner():
+            return None
 
-        params = {"authToken": self._auth_token}
+        if not self._is_cache_fresh(self._state.get(ARCSIGHT_STATE_AUTH_TIMESTAMP)):
+            return None
 
-        ret_val, resp = self._make_rest_call(endpoint, action_result, params)
+        try:
+            token = encryption_helper.decrypt(encrypted_token, self.get_asset_id())
+        except Exception as e:
+            self.debug_print(f"Unable to decrypt the cached auth token. {self._get_error_message_from_exception(e)}")
+            return None
 
-        if phantom.is_fail(ret_val):
-            return phantom.APP_ERROR, resp
+        if not token or token == rejected_token:
+            return None
 
-        self.debug_print(resp)
+        return token
 
-        return phantom.APP_SUCCESS, resp
+    def _save_cached_auth(self):
 
-    def _make_rest_call(self, endpoint, action_result, params=None, data=None, json=None, headers=None, method="get"):
+        # a replayed login returns the scrubbed token, a later live run must not reuse it
+        if not self._token_ttl or self._replayer is not None:
+            return
 
-        config = self.get_config()
+        try:
+            self._set_state(ARCSIGHT_STATE_AUTH_TOKEN, encryption_helper.encrypt(self._auth_token, self.get_asset_id()))
+        except Exception as e:
+            self.debug_print(f"Unable to encrypt the auth token, it will not be cached. {self._get_error_message_from_exception(e)}")
+            return
 
-        request_func = getattr(requests, method)
+        self._set_state(ARCSIGHT_STATE_AUTH_OWNER, self._get_auth_owner())
+        self._set_state(ARCSIGHT_STATE_AUTH_TIMESTAMP, time.time())
 
-        if not request_func:
-            action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_API_UNSUPPORTED_METHOD, method=method)
+        # write it out right away, concurrent action runs are waiting on the lock for it
+        self._save_state()
 
-        url = f"{self._base_url}{endpoint}"
+    def _clear_cached_auth(self):
 
-        self.debug_print(f"Making REST Call {method.upper()} on {url}")
+        for key in (ARCSIGHT_STATE_AUTH_TOKEN, ARCSIGHT_STATE_AUTH_OWNER, ARCSIGHT_STATE_AUTH_TIMESTAMP):
+            self._pop_state(key)
 
-        _headers = {"Accept": "application/json"}
+    def _login(self, action_result, force=False, rejected_token=None):
+        """
+        Get an auth token for the ESM manager.
+
+        A token cached in the state file is reused while it is younger than the configured TTL.
+        With 'force', the cached token is ignored, unless it is newer than 'rejected_token', the token
+        the manager refused, because another thread or action run has already logged in again.
+        """
+
+        if self._auth_token is not None and not force:
+            return phantom.APP_SUCCESS
 
-        if headers:
-            _headers.update(headers)
+        if not force:
+            token = self._load_cached_auth()
+            if token is not None:
+                self.debug_print("Using the cached auth token")
+                self._auth_token = token
+                return phantom.APP_SUCCESS
 
         try:
-            response = request_func(url, params=params, data=data, json=json, headers=_headers, verify=config[phantom.APP_JSON_VERIFY])
+            with self._login_lock():
+                if rejected_token is not None and self._auth_token not in (None, rejected_token):
+                    return phantom.APP_SUCCESS
 
-        except requests.exceptions.ConnectionError as e:
-            self.debug_print(self._get_error_message_from_exception(e))
-            error_message = f"Error connecting to server. Connection refused from server for {url}"
-            return action_result.set_status(phantom.APP_ERROR, error_message), None
-        except Exception as e:
-            error_msg = self._get_error_message_from_exception(e)
-            self.debug_print(f"REST call Failed: {error_msg}")
-            return action_result.set_status(phantom.APP_ERROR, f"{ARCSIGHT_ERR_SERVER_CONNECTION}. {error_msg}"), None
+                if not force or rejected_token is not None:
+                    token = self._load_cached_auth(rejected_token, reload_state=True)
+                    if token is not None:
+                        self.debug_print("Using the auth token saved by another action run")
+                        self._auth_token = token
+                        return phantom.APP_SUCCESS
 
-        if (response.status_code != requests.codes.ok) or ("html" in response.headers.get("Content-Type", "")):  # pylint: disable=E1101
+                return self._do_login(action_result)
+        except OSError as e:
+            self.debug_print(f"Unable to lock the login, logging in without it. {self._get_error_message_from_exception(e)}")
+            return self._do_login(action_result)
+
+    def _do_login(self, action_result):
+
+        config = self.get_config()
+
+        self._clear_cached_auth()
+
+        self.save_progress("Logging into device/server")
+
+        request_data = {"log.login": {"log.login": config[ARCSIGHT_JSON_USERNAME], "log.password": config[ARCSIGHT_JSON_PASSWORD]}}
+
+        ret_val, resp = self._make_rest_call(ACRSIGHT_LOGIN_ENDPOINT, action_result, json=request_data, method="post")
+
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        # parse the response and set the auth key
+        try:
+            self._auth_token = resp["log.loginResponse"]["log.return"]
+        except Exception as e:
+            error_msg = self._get_error_message_from_exception(e)
+            self.debug_print(f"Handled exception while parsing auth token. {error_msg}")
+            return action_result.set_status(phantom.APP_ERROR, "Error parsing login response")
+
+        # validate the version, unless it was validated within the token TTL
+        if self._is_cache_fresh(self._state.get(ARCSIGHT_STATE_ESM_VERSION_TIMESTAMP)):
+            self.save_progress(f"Using the validated device version: {self._state.get(ARCSIGHT_STATE_ESM_VERSION)}")
+        else:
+            ret_val = self._validate_version(action_result)
+            if phantom.is_fail(ret_val):
+                self._auth_token = None
+                return action_result.get_status()
+
+        self._save_cached_auth()
+
+        return phantom.APP_SUCCESS
+
+    def _get_version(self, action_result):
+
+        endpoint = f"{ARCSIGHT_CASESERVICE_ENDPOINT}/getESMVersion"
+
+        params = {"authToken": self._auth_token}
+
+        ret_val, resp = self._make_rest_call(endpoint, action_result, params)
+
+        if phantom.is_fail(ret_val):
+            return phantom.APP_ERROR, resp
+
+        self._debug_print_response(resp)
+
+        return phantom.APP_SUCCESS, resp
+
+    def _make_rest_call(self, endpoint, action_result, params=None, data=None, json=None, headers=None, method="get", relogin=True):
+
+        request_func = getattr(self._get_session(), method, None)
+
+        if not request_func:
+            return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_API_UNSUPPORTED_METHOD, method=method), None
+
+        url = f"{self._base_url}{endpoint}"
+
+        self.debug_print(f"Making REST Call {method.upper()} on {url}")
+
+        attempts = self._max_retries + 1 if _is_idempotent(endpoint) else 1
+
+        for attempt in range(attempts):
+            if not self._circuit_breaker.allow():
+                return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_CIRCUIT_OPEN), None
+
+            time.sleep(self._get_throttle_delay())
+
+            response = None
+            started = time.monotonic()
+            try:
+                with self._request_semaphore:
+                    started = time.monotonic()
+                    response = self._send(request_func, method, endpoint, params=params, data=data, json=json, headers=headers)
+
+            except requests.exceptions.ConnectionError as e:
+                self.debug_print(self._get_error_message_from_exception(e))
+                error_message = f"Error connecting to server. Connection refused from server for {url}"
+            except requests.exceptions.Timeout as e:
+                error_msg = self._get_error_message_from_exception(e)
+                self.debug_print(f"REST call Failed: {error_msg}")
+                error_message = f"{ARCSIGHT_ERR_SERVER_CONNECTION}. {error_msg}"
+            except Exception as e:
+                self._record(_get_operation(endpoint), started, error=True)
+                error_msg = self._get_error_message_from_exception(e)
+                self.debug_print(f"REST call Failed: {error_msg}")
+                return action_result.set_status(phantom.APP_ERROR, f"{ARCSIGHT_ERR_SERVER_CONNECTION}. {error_msg}"), None
+
+            if response is None:
+                self._record(_get_operation(endpoint), started, error=True)
+            else:
+                self._record(
+                    _get_operation(endpoint),
+                    started,
+                    _get_request_size(response),
+                    len(response.content),
+                    response.status_code != requests.codes.ok,  # pylint: disable=E1101
+                )
+
+            if response is not None and response.status_code not in ARCSIGHT_RETRY_STATUS_CODES:
+                self._circuit_breaker.record_success()
+                break
+
+            if attempt + 1 < attempts:
+                time.sleep(self._get_retry_delay(attempt, url, response))
+        else:
+            self._record_failure()
+            if response is None:
+                return action_result.set_status(phantom.APP_ERROR, error_message), None
+
+        if (response.status_code != requests.codes.ok) or ("html" in response.headers.get("Content-Type", "")):  # pylint: disable=E1101
+            old_token = self._auth_token
+            if relogin and old_token and (_has_token(params, old_token) or _has_token(json, old_token)) and _is_auth_error(response):
+                # the token expired on the manager, log in again and replay the call with the new one
+                self.debug_print("The auth token was rejected, logging in again")
+                ret_val = self._login(action_result, force=True, rejected_token=old_token)
+                if phantom.is_fail(ret_val):
+                    return action_result.get_status(), None
+                return self._make_rest_call(
+                    endpoint,
+                    action_result,
+                    params=_replace_token(params, old_token, self._auth_token),
+                    data=data,
+                    json=_replace_token(json, old_token, self._auth_token),
+                    headers=headers,
+                    method=method,
+                    relogin=False,
+                )
+
+        return self._process_response(response, action_result)
+
+    def _send(self, request_func, method, endpoint, params=None, data=None, json=None, headers=None):
+        """Send a request to the ESM, or record it and its reply, or replay its recorded reply, as 'replay_mode' asks."""
+
+        if self._replayer is not None:
+            entry = self._replayer.reply(method, endpoint, params, json)
+
+            if entry is None:
+                # fail like the ESM does, with the reason in a <pre> element of an HTML page
+                content = f"<html><body><pre>{ARCSIGHT_ERR_NO_RECORDED_REPLY.format(operation=_get_operation(endpoint))}</pre></body></html>"
+                return _BufferedResponse(requests.codes.not_found, {"Content-Type": "text/html"}, content.encode())  # pylint: disable=E1101
+
+            return _BufferedResponse(entry["status"], {"Content-Type": entry["content_type"]}, entry["body"].encode())
+
+        started = time.monotonic()
+
+        response = request_func(f"{self._base_url}{endpoint}", params=params, data=data, json=json, headers=headers)
+
+        if self._recorder is not None:
+            self._recorder.record(
+                method,
+                endpoint,
+                params,
+                json,
+                response.status_code,
+                response.headers.get("Content-Type", ""),
+                response.content,
+                time.monotonic() - started,
+            )
+
+        return response
+
+    def _get_throttle_delay(self):
+        """Reserve a call from the rate limit and return how long to wait before making it."""
+
+        if self._rate_limiter is None:
+            return 0
+
+        delay = self._rate_limiter.reserve()
+
+        if delay:
+            with self._policy_lock:
+                self._throttle_delay += delay
+
+        return delay
+
+    def _get_retry_delay(self, attempt, url, response):
+        """Return the exponential backoff with full jitter before retrying a failed call."""
+
+        delay = random.uniform(0, min(ARCSIGHT_MAX_RETRY_DELAY, self._retry_backoff * 2**attempt))
+
+        with self._policy_lock:
+            self._retries += 1
+
+        reason = "Connection failed" if response is None else f"Status Code: {response.status_code}"
+        self.debug_print(f"{reason}, retrying {url} in {delay:.2f} seconds (attempt {attempt + 2})")
+
+        return delay
+
+    def _record_failure(self):
+
+        if self._circuit_breaker.record_failure():
+            self.save_progress(f"The ESM manager failed {self._circuit_breaker.failures} calls in a row, opening the circuit breaker")
+
+    def _capture_debug_data(self, response, action_result):
+        """
+        Add a reply to the debug data of the action as the 'debug_capture' level asks.
+
+        The reply text is only decoded when the level keeps it, and nothing more is added once the debug data
+        of the action reaches 'debug_capture_action_bytes'.
+        """
+        if self._debug_capture == ARCSIGHT_DEBUG_CAPTURE_OFF or self._debug_capped:
+            return
+
+        content = response.content
+
+        if self._debug_capture == ARCSIGHT_DEBUG_CAPTURE_SUMMARY:
+            reply = f"Status Code: {response.status_code}. Content-Type: {response.headers.get('Content-Type', '')}. {len(content)} bytes"
+        elif self._debug_capture == ARCSIGHT_DEBUG_CAPTURE_TRUNCATED and len(content) > self._debug_capture_call_bytes:
+            reply = f"{content[: self._debug_capture_call_bytes].decode(errors='replace')}... [{len(content) - self._debug_capture_call_bytes} more bytes]"
+        else:
+            # JSON is UTF-8 unless the reply says otherwise, 'response.text' would guess the charset of the whole body
+            reply = content.decode(response.encoding or "utf-8", errors="replace")
+
+        with self._debug_lock:
+            if self._debug_capture_action_bytes and self._debug_bytes + len(reply) > self._debug_capture_action_bytes:
+                if not self._debug_capped:
+                    self._debug_capped = True
+                    self.debug_print(f"The debug data of the action reached {self._debug_bytes} bytes, not capturing more replies")
+                return
+
+            self._debug_bytes += len(reply)
+
+        action_result.add_debug_data(reply)
+
+    def _debug_print_response(self, resp):
+        """Log a whole decoded reply, only with the 'full' debug capture level."""
+
+        if self._debug_capture == ARCSIGHT_DEBUG_CAPTURE_FULL:
+            self.debug_print(resp)
+
+    def _process_response(self, response, action_result):
+        """Check the status and content type of a reply and parse its JSON body."""
+
+        if (response.status_code != requests.codes.ok) or ("html" in response.headers.get("Content-Type", "")):  # pylint: disable=E1101
             message = _parse_error(response)
             self.debug_print(message)
             return action_result.set_status(phantom.APP_ERROR, message), None
 
-        reply = response.text
-
-        action_result.add_debug_data(reply)
+        self._capture_debug_data(response, action_result)
 
         try:
-            response_dict = response.json()
+            response_dict = _loads(response.content)
         except Exception as e:
             error_msg = self._get_error_message_from_exception(e)
             self.debug_print(f"Unable to parse response dict. {error_msg}")
@@ -331,6 +1343,193 @@ class ArcsightConnector(BaseConnector):
 
         return phantom.APP_SUCCESS, response_dict
 
+    def _rest_call(self, call):
+        """
+        Make one call described by a dictionary of '_make_rest_call' arguments.
+
+        :return: ActionResult of the call, response dictionary (None on failure)
+        """
+        call_act_res = ActionResult()
+
+        ret_val, resp = self._make_rest_call(
+            call["endpoint"], call_act_res, params=call.get("params"), json=call.get("json"), method=call.get("method", "get")
+        )
+
+        if phantom.is_fail(ret_val):
+            return call_act_res, None
+
+        return call_act_res, resp
+
+    def _fan_out(self, calls):
+        """
+        Make many independent calls and return their (ActionResult, response dictionary or None) in order.
+
+        With the async transport the calls run on the event loop of the action run, which has at most
+        'max_async_requests' calls in flight, otherwise on a pool of 'max_concurrency' threads.
+        """
+        if len(calls) <= 1:
+            return [self._rest_call(call) for call in calls]
+
+        if not self._async_transport:
+            with ThreadPoolExecutor(max_workers=min(self._max_concurrency, len(calls))) as executor:
+                return list(executor.map(self._rest_call, calls))
+
+        token = self._auth_token
+
+        results = asyncio.run_coroutine_threadsafe(self._fan_out_async(calls), self._get_async_loop()).result()
+
+        # the calls rejected for an expired token are replayed one by one, the first one logs in again
+        for i, result in enumerate(results):
+            if result is not None:
+                continue
+
+            call = dict(calls[i])
+            call["params"] = _replace_token(call.get("params"), token, self._auth_token)
+            call["json"] = _replace_token(call.get("json"), token, self._auth_token)
+            results[i] = self._rest_call(call)
+
+        return results
+
+    def _get_async_loop(self):
+        """
+        Start the event loop of the async transport on a thread of its own, with its aiohttp session.
+
+        The loop is kept for the whole action run and every worker thread submits its calls to it, so the
+        connections are reused across fan-outs and 'max_async_requests' caps the calls of the action run.
+        """
+        with self._session_lock:
+            if self._async_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="arcsight-async", daemon=True)
+                thread.start()
+
+                try:
+                    asyncio.run_coroutine_threadsafe(self._open_async_session(), loop).result()
+                except Exception:
+                    loop.call_soon_threadsafe(loop.stop)
+                    thread.join()
+                    loop.close()
+                    raise
+
+                self._async_loop = loop
+                self._async_thread = thread
+
+            return self._async_loop
+
+    async def _open_async_session(self):
+
+        config = self.get_config()
+
+        self._async_semaphore = asyncio.Semaphore(self._max_async_requests)
+        connector = aiohttp.TCPConnector(limit=self._max_async_requests, ssl=None if config[phantom.APP_JSON_VERIFY] else False)
+        self._async_session = aiohttp.ClientSession(connector=connector, headers={"Accept": "application/json"})
+
+    def _close_async_loop(self):
+
+        if self._async_loop is None:
+            return
+
+        loop = self._async_loop
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._async_session.close(), loop).result()
+            asyncio.run_coroutine_threadsafe(loop.shutdown_default_executor(), loop).result()
+        except Exception as e:
+            self.debug_print(f"Unable to close the async transport session. {self._get_error_message_from_exception(e)}")
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            self._async_thread.join()
+            loop.close()
+
+            self._async_loop = None
+            self._async_thread = None
+            self._async_session = None
+            self._async_semaphore = None
+
+    async def _fan_out_async(self, calls):
+
+        return await asyncio.gather(*(self._make_rest_call_async(self._async_session, self._async_semaphore, call) for call in calls))
+
+    async def _make_rest_call_async(self, session, semaphore, call):
+        """
+        The '_make_rest_call' of the async transport.
+
+        :return: ActionResult of the call, response dictionary (None on failure),
+            or None when the manager rejected the auth token of the call
+        """
+        call_act_res = ActionResult()
+
+        method = call.get("method", "get")
+        url = f"{self._base_url}{call['endpoint']}"
+
+        self.debug_print(f"Making REST Call {method.upper()} on {url}")
+
+        attempts = self._max_retries + 1 if _is_idempotent(call["endpoint"]) else 1
+
+        for attempt in range(attempts):
+            if not self._circuit_breaker.allow():
+                call_act_res.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_CIRCUIT_OPEN)
+                return call_act_res, None
+
+            if self._rate_limiter is not None:
+                # the rate limit is kept in a locked file, wait for the lock off the event loop
+                await asyncio.sleep(await asyncio.get_running_loop().run_in_executor(None, self._get_throttle_delay))
+
+            response = None
+            started = time.monotonic()
+            try:
+                async with semaphore:
+                    started = time.monotonic()
+                    async with session.request(method.upper(), url, params=call.get("params"), json=call.get("json")) as reply:
+                        content = await reply.read()
+                        response = _BufferedResponse(reply.status, reply.headers, content, reply.charset)
+
+            except aiohttp.ClientConnectionError as e:
+                self.debug_print(self._get_error_message_from_exception(e))
+                error_message = f"Error connecting to server. Connection refused from server for {url}"
+            except asyncio.TimeoutError as e:
+                error_msg = self._get_error_message_from_exception(e)
+                self.debug_print(f"REST call Failed: {error_msg}")
+                error_message = f"{ARCSIGHT_ERR_SERVER_CONNECTION}. {error_msg}"
+            except Exception as e:
+                self._record(_get_operation(call["endpoint"]), started, error=True)
+                error_msg = self._get_error_message_from_exception(e)
+                self.debug_print(f"REST call Failed: {error_msg}")
+                call_act_res.set_status(phantom.APP_ERROR, f"{ARCSIGHT_ERR_SERVER_CONNECTION}. {error_msg}")
+                return call_act_res, None
+
+            if response is None:
+                self._record(_get_operation(call["endpoint"]), started, error=True)
+            elif self._metrics is not None:
+                # aiohttp does not keep the request body, measure the JSON it was made of
+                bytes_sent = len(json.dumps(call["json"])) if call.get("json") is not None else 0
+                self._record(
+                    _get_operation(call["endpoint"]), started, bytes_sent, len(response.content), response.status_code != requests.codes.ok
+                )  # pylint: disable=E1101
+
+            if response is not None and response.status_code not in ARCSIGHT_RETRY_STATUS_CODES:
+                self._circuit_breaker.record_success()
+                break
+
+            if attempt + 1 < attempts:
+                await asyncio.sleep(self._get_retry_delay(attempt, url, response))
+        else:
+            self._record_failure()
+            if response is None:
+                call_act_res.set_status(phantom.APP_ERROR, error_message)
+                return call_act_res, None
+
+        token = self._auth_token
+        if token and (_has_token(call.get("params"), token) or _has_token(call.get("json"), token)) and _is_auth_error(response):
+            return None
+
+        ret_val, resp = self._process_response(response, call_act_res)
+
+        if phantom.is_fail(ret_val):
+            return call_act_res, None
+
+        return call_act_res, resp
+
     def _get_case_events(self, event_ids, action_result):
 
         if not isinstance(event_ids, (list, tuple)):
@@ -346,49 +1545,148 @@ class ArcsightConnector(BaseConnector):
 
         return phantom.APP_SUCCESS, events_details
 
-    def _get_events_details(self, event_ids, action_result):
-
-        endpoint = f"{ARCSIGHT_SECURITYEVENTSERVICE_ENDPOINT}/getSecurityEvents"
+    def _get_events_call(self, event_ids):
 
         # params = {'authToken': self._auth_token, 'ids': event_id, 'startMillis': '-1', 'endMillis': '-1'}
         request_data = {
-            "sev.getSecurityEvents": {"sev.authToken": self._auth_token, "sev.ids": event_ids, "sev.startMillis": "-1", "sev.endMillis": "-1"}
+            "sev.getSecurityEvents": {
+                "sev.authToken": self._auth_token,
+                "sev.ids": event_ids,
+                "sev.startMillis": "-1",
+                "sev.endMillis": "-1",
+            }
         }
 
-        ret_val, resp = self._make_rest_call(endpoint, action_result, params=None, data=None, json=request_data, headers=None, method="post")
+        return {"endpoint": f"{ARCSIGHT_SECURITYEVENTSERVICE_ENDPOINT}/getSecurityEvents", "json": request_data, "method": "post"}
 
-        if phantom.is_fail(ret_val):
-            return phantom.APP_ERROR, None
+    def _get_events_details(self, event_ids, action_result):
+        """
+        Get the events with the given IDs.
 
-        # parse the response and get the ids of all the cases
-        self.debug_print(resp)
+        Events found in the event cache are not requested again. The other IDs are split into chunks of
+        'event_batch_size' that are fetched concurrently. The events are returned in the order of event_ids.
+        """
 
-        try:
-            events_details = resp.get("sev.getSecurityEventsResponse", {}).get("sev.return", {})
-        except:
-            events_details = {}
+        event_ids_order = [str(event_id) for event_id in event_ids]
 
-        return phantom.APP_SUCCESS, events_details
+        cached_events = {}
+        if self._event_cache is not None:
+            cached_events, _ = self._event_cache.get_many(event_ids_order)
+            event_ids = [event_id for event_id in event_ids if str(event_id) not in cached_events]
 
-    def _get_case_details(self, case_id, action_result):
+        chunks = [event_ids[i : i + self._event_batch_size] for i in range(0, len(event_ids), self._event_batch_size)]
 
-        endpoint = f"{ARCSIGHT_CASESERVICE_ENDPOINT}/getResourceById"
+        chunk_results = self._fan_out([self._get_events_call(chunk) for chunk in chunks])
 
-        params = {"authToken": self._auth_token, "resourceId": case_id}
+        events_details = []
 
-        ret_val, resp = self._make_rest_call(endpoint, action_result, params)
+        for chunk_act_res, resp in chunk_results:
+            if resp is None:
+                return action_result.set_status(phantom.APP_ERROR, chunk_act_res.get_message()), None
+
+            # parse the response and get the events
+            self._debug_print_response(resp)
+
+            try:
+                chunk_events = resp.get("sev.getSecurityEventsResponse", {}).get("sev.return", [])
+            except:
+                chunk_events = []
+
+            if not chunk_events:
+                chunk_events = []
+            elif not isinstance(chunk_events, (list, tuple)):
+                chunk_events = [chunk_events]
+
+            events_details.extend(chunk_events)
+
+        if self._event_cache is None:
+            return phantom.APP_SUCCESS, events_details
+
+        fetched_events = {str(event.get("eventId")): event for event in events_details}
+        self._event_cache.put_many(fetched_events.items())
+
+        events = []
+        for event_id in event_ids_order:
+            event = cached_events.get(event_id) or fetched_events.get(event_id)
+            if event:
+                events.append(event)
+
+        return phantom.APP_SUCCESS, events
+
+    def _get_case_details(self, case_id, action_result):
+
+        call = self._get_case_details_call(case_id)
+
+        ret_val, resp = self._make_rest_call(call["endpoint"], action_result, call["params"])
 
         if phantom.is_fail(ret_val):
             return phantom.APP_ERROR, {}
 
         # parse the response and get the ids of all the cases
-        self.debug_print(resp)
-        try:
-            case_details = resp.get("cas.getResourceByIdResponse", {}).get("cas.return", {})
-        except:
-            case_details = {}
+        self._debug_print_response(resp)
 
-        return phantom.APP_SUCCESS, case_details
+        return phantom.APP_SUCCESS, _get_case_from_reply(resp)
+
+    def _get_case_details_call(self, case_id):
+
+        return {"endpoint": f"{ARCSIGHT_CASESERVICE_ENDPOINT}/getResourceById", "params": {"authToken": self._auth_token, "resourceId": case_id}}
+
+    def _get_case_cache_path(self):
+
+        return os.path.join(self.get_state_dir(), ARCSIGHT_CASE_CACHE_FILE.format(asset_id=self.get_asset_id()))
+
+    def _get_case_cache(self):
+        """Get the case cache shared by the ticket actions, None when 'case_cache_ttl' is 0."""
+
+        if not self._case_cache_ttl:
+            return None
+
+        if self._case_cache is None:
+            self._case_cache = LRUCache(ARCSIGHT_DEFAULT_CASE_CACHE_SIZE)
+            self._case_cache.load(self._get_case_cache_path())
+
+        return self._case_cache
+
+    def _get_cached_cases(self, case_ids, action_result):
+        """
+        Get the details of cases from the case cache, the others are fetched and cached for 'case_cache_ttl' seconds.
+
+        :return: status success/failure, dictionary of case ID to case details, number of cases found in the cache
+        """
+        case_cache = self._get_case_cache()
+
+        cases_details = {}
+
+        if case_cache is not None:
+            found, _ = case_cache.get_many(case_ids)
+            cases_details = {
+                case_id: case_details
+                for case_id, (cached_at, case_details) in found.items()
+                if self._is_cache_fresh(cached_at, self._case_cache_ttl)
+            }
+
+        missing = [case_id for case_id in case_ids if case_id not in cases_details]
+        cache_hits = len(case_ids) - len(missing)
+
+        if len(missing) == 1:
+            ret_val, case_details = self._get_case_details(missing[0], action_result)
+            # the manager returns no details for an unknown case ID
+            fetched = {missing[0]: case_details} if isinstance(case_details, dict) and case_details.get("resourceid") else {}
+        elif missing:
+            ret_val, fetched, _ = self._get_cases_details(missing, action_result)
+        else:
+            ret_val, fetched = phantom.APP_SUCCESS, {}
+
+        if phantom.is_fail(ret_val):
+            return action_result.get_status(), None, cache_hits
+
+        cases_details.update(fetched)
+
+        if case_cache is not None:
+            now = time.time()
+            case_cache.put_many((case_id, [now, case_details]) for case_id, case_details in fetched.items())
+
+        return phantom.APP_SUCCESS, cases_details, cache_hits
 
     def _get_all_case_ids(self, param, action_result):
 
@@ -402,252 +1700,723 @@ class ArcsightConnector(BaseConnector):
             return phantom.APP_ERROR, []
 
         # parse the response and get the ids of all the cases
-        self.debug_print(resp)
+        self._debug_print_response(resp)
 
         try:
             case_ids = resp.get("cas.findAllIdsResponse", {}).get("cas.return", [])
         except:
             case_ids = []
 
-        if not isinstance(case_ids, (list, tuple)):
-            case_ids = [case_ids]
+        if not isinstance(case_ids, (list, tuple)):
+            case_ids = [case_ids]
+
+        return phantom.APP_SUCCESS, case_ids
+
+    def _get_cases_details(self, case_ids, action_result, select=None):
+        """
+        Fetch the details of many cases with batched getResourcesByIds calls.
+
+        A case that could not be fetched, or that has no resourceid, is left out of the details and does not
+        stop the others. The batches are fetched a round of concurrent calls at a time, and with 'select' only
+        the details it returns true for (given the case ID and details) are kept, so that the replies of all
+        the cases are never held at once.
+
+        :return: status success/failure, dictionary of case ID to case details,
+            dictionary of case ID to error message for the cases whose fetch failed
+        """
+        endpoint = f"{ARCSIGHT_CASESERVICE_ENDPOINT}/getResourcesByIds"
+
+        cases_details = {}
+        errors = {}
+
+        def keep(case_id, case_details):
+            if select is None or select(case_id, case_details):
+                cases_details[case_id] = case_details
+
+        batches = [case_ids[i : i + ARCSIGHT_CASE_DETAILS_BATCH_SIZE] for i in range(0, len(case_ids), ARCSIGHT_CASE_DETAILS_BATCH_SIZE)]
+        round_size = self._max_async_requests if self._async_transport else self._max_concurrency
+
+        for start in range(0, len(batches), round_size):
+            round_batches = batches[start : start + round_size]
+
+            calls = [
+                {
+                    "endpoint": endpoint,
+                    "json": {"cas.getResourcesByIds": {"cas.authToken": self._auth_token, "cas.ids": batch}},
+                    "method": "post",
+                }
+                for batch in round_batches
+            ]
+
+            for batch, (_, resp) in zip(round_batches, self._fan_out(calls)):
+                if resp is None:
+                    # older managers do not support the bulk call, fall back to one call per case
+                    self.debug_print("Unable to fetch the case details in bulk, fetching them one by one")
+                    case_calls = [self._get_case_details_call(case_id) for case_id in batch]
+                    for case_id, (case_act_res, case_resp) in zip(batch, self._fan_out(case_calls)):
+                        if case_resp is None:
+                            errors[case_id] = case_act_res.get_message()
+                            continue
+                        case_details = _get_case_from_reply(case_resp)
+                        if isinstance(case_details, dict) and case_details.get("resourceid"):
+                            keep(case_id, case_details)
+                    continue
+
+                try:
+                    batch_details = resp.get("cas.getResourcesByIdsResponse", {}).get("cas.return", [])
+                except:
+                    batch_details = []
+
+                if not isinstance(batch_details, (list, tuple)):
+                    batch_details = [batch_details]
+
+                for case_details in batch_details:
+                    if isinstance(case_details, dict) and case_details.get("resourceid"):
+                        keep(case_details["resourceid"], case_details)
+
+        if errors:
+            self.debug_print(f"Unable to fetch the details of {len(errors)} case(s)")
+
+        return phantom.APP_SUCCESS, cases_details, errors
+
+    def _get_artifact(self, i, event):
+
+        cef = _event_to_cef(event)
+
+        if not cef:
+            return None
+
+        self.send_progress("Processing Event ID: {}".format(event["eventId"]))
+
+        return {
+            "source_data_identifier": event["eventId"],
+            "name": event.get("name", f"Artifact # {i}"),
+            "data": event,
+            "start_time": _get_str_from_epoch(event.get("startTime")),
+            "end_time": _get_str_from_epoch(event.get("endTime")),
+            "cef": cef,
+        }
+
+    def _get_case(self, case_id, action_result, case_details=None, artifact_count=None):
+        """
+        Get the container and artifacts of a case.
+
+        With 'artifact_count', only as many events are fetched as could become artifacts. Events without
+        any CEF value do not make an artifact, so the shortfall is fetched until the count is reached.
+        A case whose hash matches the one in the case index is returned without artifacts, its events are not fetched.
+        """
+
+        if case_details is None:
+            ret_val, case_details = self._get_case_details(case_id, action_result)
+
+            if phantom.is_fail(ret_val):
+                self.save_progress(f"Ignoring Case ID: {case_id}, could not get details.")
+                return action_result.get_status(), None, None
+
+        self.send_progress(f"Processing Case ID: {case_id}")
+
+        # create a container
+        container = {
+            "source_data_identifier": case_id,
+            "name": case_details["name"],
+            "description": case_details.get("description"),
+            "data": {"case_detail": case_details},
+            "start_time": _get_str_from_epoch(case_details.get("createdTimestamp")),
+        }
+
+        event_ids = case_details.get("eventIDs")
+
+        if not event_ids:
+            self.save_progress("Ignoring Case: {}({}) since it has no events".format(case_details["name"], case_id))
+            # still a success, so that the case is indexed and not read again until it changes
+            return phantom.APP_SUCCESS, container, None
+
+        if not isinstance(event_ids, (list, tuple)):
+            event_ids = [event_ids]
+
+        if self._case_index is not None:
+            indexed_case = self._case_index.get(case_id)
+            if indexed_case and indexed_case.get("hash") == _get_case_hash(case_details):
+                self.send_progress(f"Skipping Case ID: {case_id}, it is unchanged since it was ingested")
+                return phantom.APP_SUCCESS, container, None
+
+        if artifact_count is None:
+            artifact_count = len(event_ids)
+
+        artifacts = []
+        offset = 0
+
+        while offset < len(event_ids) and len(artifacts) < artifact_count:
+            batch_ids = event_ids[offset : offset + artifact_count - len(artifacts)]
+
+            # now get the events for this container
+            ret_val, events = self._get_case_events(batch_ids, action_result)
+
+            if phantom.is_fail(ret_val):
+                return action_result.get_status(), container, None
+
+            for i, event in enumerate(events, offset):
+                artifact = self._get_artifact(i, event)
+                if artifact:
+                    artifacts.append(artifact)
+
+            offset += len(batch_ids)
+
+        return phantom.APP_SUCCESS, container, artifacts
+
+    def _save_case(self, container, artifacts, artifact_count):
+        """
+        Save the container of a case and its artifacts, the artifacts in batches of 'artifact_batch_size'.
+
+        :return: status of the container save, container ID, number of artifacts saved, number of artifacts that failed to save
+        """
+
+        container.update(_container_common)
+
+        started = time.monotonic()
+        (ret_val, message, container_id) = self.save_container(container)
+        self._record("save_container", started, error=phantom.is_fail(ret_val))
+        self.debug_print(f"save_container returns, value: {ret_val}, reason: {message}, id: {container_id}")
+
+        if phantom.is_fail(ret_val) or not container_id:
+            return phantom.APP_ERROR, None, 0, 0
+
+        artifacts = [artifact for artifact in artifacts[:artifact_count] if artifact]
+
+        len_artifacts = len(artifacts)
+
+        for j, artifact in enumerate(artifacts):
+            # add the container id to the artifact
+            artifact["container_id"] = container_id
+            artifact.update(_artifact_common)
+
+            # mark only the last artifact of the container such that active playbooks get executed
+            artifact["run_automation"] = (j + 1) == len_artifacts
+
+        saved_artifacts = 0
+        failed_artifacts = 0
+
+        for i in range(0, len_artifacts, self._artifact_batch_size):
+            batch = artifacts[i : i + self._artifact_batch_size]
+
+            started = time.monotonic()
+            ret_val, status_string, artifact_ids = self.save_artifacts(batch)
+            self._record("save_artifacts", started, error=phantom.is_fail(ret_val))
+            self.debug_print(f"save_artifacts returns, value: {ret_val}, reason: {status_string}, ids: {artifact_ids}")
+
+            if phantom.is_fail(ret_val) or not isinstance(artifact_ids, (list, tuple)):
+                failed_artifacts += len(batch)
+                continue
+
+            saved = len([artifact_id for artifact_id in artifact_ids if artifact_id])
+            saved_artifacts += saved
+            failed_artifacts += len(batch) - saved
+
+        return phantom.APP_SUCCESS, container_id, saved_artifacts, failed_artifacts
+
+    def _fetch_case(self, case_id, case_details=None, artifact_count=None):
+        """Worker of the ingestion thread pool, a failing case must not stop the others."""
+
+        case_act_res = ActionResult()
+
+        try:
+            return self._get_case(case_id, case_act_res, case_details, artifact_count)
+        except Exception as e:
+            error_msg = self._get_error_message_from_exception(e)
+            self.save_progress(f"Ignoring Case ID: {case_id}, error occurred while processing it. {error_msg}")
+            return phantom.APP_ERROR, None, None
+
+    def _iter_cases(self, case_ids, cases_details, artifact_count=None, get_remaining=None):
+        """
+        Fetch the cases with up to 'max_concurrency' worker threads and yield them in the order of case_ids.
+
+        At most twice as many cases as there are workers are fetched ahead of the consumer, so the memory used
+        does not depend on the number of cases polled. 'get_remaining' returns the number of containers the
+        consumer still needs, no more cases than that are fetched ahead, so no case is fetched to be dropped.
+
+        :return: generator of (case ID, status, container, artifacts)
+        """
+        case_ids_iter = iter(case_ids)
+        pending = deque()
+
+        def submit_more():
+            limit = 2 * self._max_concurrency
+            if get_remaining is not None:
+                limit = min(limit, get_remaining())
+
+            while len(pending) < limit:
+                case_id = next(case_ids_iter, None)
+                if case_id is None:
+                    return
+                pending.append((case_id, executor.submit(self._fetch_case, case_id, cases_details.get(case_id), artifact_count)))
+
+        executor = ThreadPoolExecutor(max_workers=self._max_concurrency)
+
+        try:
+            submit_more()
+
+            while pending:
+                case_id, future = pending.popleft()
+                ret_val, container, artifacts = future.result()
+                yield case_id, ret_val, container, artifacts
+                # the consumer has processed the case, it may need fewer containers now
+                submit_more()
+        finally:
+            # the consumer may stop early, drop whatever was not started yet
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _ingest_cases(self, case_ids, param, action_result, cases_details=None):
+        """
+        Ingest the given cases into containers and artifacts.
+
+        Every case is saved as soon as it is fetched, in the order of case_ids. The fetching stops once
+        'container_count' containers were saved, so the cases after that are never requested.
+
+        :param cases_details: optional dictionary of case ID to already fetched case details
+        :return: dictionary of the IDs of the cases that were processed to their case index entry
+        """
+        container_count = param.get(phantom.APP_JSON_CONTAINER_COUNT, ARCSIGHT_DEFAULT_CONTAINER_COUNT)
+        artifact_count = param.get(phantom.APP_JSON_ARTIFACT_COUNT, ARCSIGHT_DEFAULT_ARTIFACT_COUNT)
+
+        cases_details = cases_details or {}
+
+        processed_cases = {}
+        saved_containers = 0
+        saved_artifacts = 0
+        failed_artifacts = 0
+
+        event_cache_path = None
+        if self._event_cache is not None and self._persist_event_cache:
+            event_cache_path = os.path.join(self.get_state_dir(), ARCSIGHT_EVENT_CACHE_FILE.format(asset_id=self.get_asset_id()))
+            if self._event_cache.load(event_cache_path):
+                self.save_progress(f"Loaded {len(self._event_cache)} cached event(s)")
+
+        self.save_progress("Ingesting cases into Containers and Artifacts")
+
+        for case_id, ret_val, container, artifacts in self._iter_cases(
+            case_ids, cases_details, artifact_count, lambda: container_count - saved_containers
+        ):
+            if phantom.is_fail(ret_val):
+                continue
+
+            case_details = container["data"]["case_detail"]
+            processed_cases[case_id] = {"modified": case_details.get("modifiedTimestamp"), "hash": _get_case_hash(case_details)}
+
+            if not artifacts:
+                continue
+
+            ret_val, container_id, saved, failed = self._save_case(container, artifacts, artifact_count)
+            if phantom.is_fail(ret_val):
+                del processed_cases[case_id]
+                continue
+
+            processed_cases[case_id]["container_id"] = container_id
+
+            saved_containers += 1
+            saved_artifacts += saved
+            failed_artifacts += failed
+
+            if saved_containers >= container_count:
+                self.save_progress(f"Reached the limit of {container_count} containers")
+                break
+
+        self.send_progress("Done Processing Cases and Events")
+
+        action_result.update_summary(
+            {"saved_containers": saved_containers, "saved_artifacts": saved_artifacts, "failed_artifacts": failed_artifacts}
+        )
+
+        if self._event_cache is not None:
+            action_result.update_summary({"event_cache_hits": self._event_cache.hits, "event_cache_misses": self._event_cache.misses})
+
+        if event_cache_path:
+            try:
+                self._event_cache.save(event_cache_path)
+            except Exception as e:
+                self.debug_print(f"Unable to save the event cache. {self._get_error_message_from_exception(e)}")
+
+        return processed_cases
+
+    def _poll_now(self, param):
+
+        action_result = self.add_action_result(ActionResult(param))
+
+        ret_val = self._login(action_result)
+
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        container_id = param.get(phantom.APP_JSON_CONTAINER_ID)
+
+        if container_id:
+            case_ids = param[phantom.APP_JSON_CONTAINER_ID]
+            case_ids = case_ids.split(",")
+        else:
+            ret_val, case_ids = self._get_all_case_ids(param, action_result)
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
+
+        self.debug_print("Case IDS:", case_ids)
+
+        self._ingest_cases(case_ids, param, action_result)
+
+        return action_result.set_status(phantom.APP_SUCCESS)
+
+    def _on_poll(self, param):
+        """
+        Ingest the cases that are new or were modified since the last poll.
+
+        The case index in the state maps every ingested case ID to the modifiedTimestamp and content hash it had
+        when it was ingested and to its container ID. Only the details of the already known cases are fetched
+        (in bulk) to find the modified ones, and the events of a modified case are fetched again only when its
+        content hash changed. The ESM cannot list the cases modified since a time, so reading the details of
+        every known case keeps a poll O(cases on the manager), only the events and saves are O(changed cases).
+        The index keeps every ingested case that the manager still lists, a case dropped from it would look
+        new to the next poll and be ingested again.
+        """
+
+        action_result = self.add_action_result(ActionResult(param))
+
+        ret_val = self._login(action_result)
+
+        if phantom.is_fail(ret_val):
+            self.save_progress("On Poll Action Failed")
+            return action_result.get_status()
+
+        ret_val, container_count = self._validate_integer(
+            action_result, param.get(phantom.APP_JSON_CONTAINER_COUNT, ARCSIGHT_DEFAULT_CONTAINER_COUNT), phantom.APP_JSON_CONTAINER_COUNT
+        )
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        ret_val, case_ids = self._get_all_case_ids(param, action_result)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        # forget the cases that no longer exist on the manager, this keeps the checkpoint bounded
+        all_case_ids = set(case_ids)
+        case_index = {k: v for k, v in self._state.get(ARCSIGHT_STATE_CASE_INDEX, {}).items() if k in all_case_ids}
+
+        known_case_ids = [case_id for case_id in case_ids if case_id in case_index]
+
+        # only the details of the modified cases are kept, the others are dropped as their batch arrives
+        ret_val, cases_details, _ = self._get_cases_details(
+            known_case_ids,
+            action_result,
+            lambda case_id, case_details: case_details.get("modifiedTimestamp") != case_index.get(case_id, {}).get("modified"),
+        )
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        pending_case_ids = [case_id for case_id in case_ids if case_id not in case_index or case_id in cases_details]
+
+        self.save_progress(f"Found {len(pending_case_ids)} new or modified case(s) out of {len(case_ids)}")
+
+        # prefetch in bulk the new cases that can fill the containers of this poll, the ingestion stops at
+        # 'container_count' containers and the cases it did not reach are picked up by the next poll
+        new_case_ids = [case_id for case_id in pending_case_ids[:container_count] if case_id not in cases_details]
+        ret_val, new_cases_details, _ = self._get_cases_details(new_case_ids, action_result)
+        if phantom.is_fail(ret_val):
+            return action_result.get_status()
+
+        cases_details.update(new_cases_details)
+
+        self._case_index = case_index
+
+        try:
+            processed_cases = self._ingest_cases(pending_case_ids, param, action_result, cases_details)
+        finally:
+            self._case_index = None
+
+        for case_id, indexed_case in processed_cases.items():
+            # an unchanged case keeps the container ID it was saved into
+            case_index.setdefault(case_id, {}).update(indexed_case)
+
+        self._set_state(ARCSIGHT_STATE_CASE_INDEX, case_index)
+
+        action_result.update_summary({"total_cases": len(case_ids), "ingested_cases": len(processed_cases)})
+
+        self.save_progress("On Poll Action Passed")
+        return action_result.set_status(phantom.APP_SUCCESS)
+
+    def _test_connectivity(self, param):
+
+        action_result = self.add_action_result(ActionResult(param))
+
+        ret_val = self._login(action_result, force=True)
+
+        if phantom.is_fail(ret_val):
+            self.save_progress("Test Connectivity Failed")
+            return action_result.get_status()
+
+        self.save_progress("Test Connectivity Passed")
+
+        return action_result.set_status(phantom.APP_SUCCESS)
+
+    def _get_group_details(self, group_uri, action_result):
+
+        endpoint = f"{ARCSIGHT_GROUPSERVICE_ENDPOINT}/getGroupByURI"
+
+        request_data = {"gro.getGroupByURI": {"gro.authToken": self._auth_token, "gro.uri": group_uri}}
+
+        ret_val, resp = self._make_rest_call(endpoint, action_result, json=request_data, method="post")
+
+        if phantom.is_fail(ret_val):
+            return phantom.APP_ERROR, {}
+
+        try:
+            group_details = resp.get("gro.getGroupByURIResponse", {}).get("gro.return", {})
+        except:
+            group_details = {}
+
+        return phantom.APP_SUCCESS, group_details
+
+    def _get_child_id_by_name(self, parent_group_id, case_name, action_result):
+
+        call = self._get_child_id_call(parent_group_id, case_name)
+
+        ret_val, resp = self._make_rest_call(call["endpoint"], action_result, json=call["json"], method="post")
+
+        if phantom.is_fail(ret_val):
+            return action_result.get_status(), None
+
+        return phantom.APP_SUCCESS, _get_child_id(resp)
+
+    def _get_child_id_call(self, parent_group_id, case_name):
+
+        request_data = {
+            "gro.getChildIDByChildNameOrAlias": {"gro.authToken": self._auth_token, "gro.groupId": parent_group_id, "gro.name": case_name}
+        }
+
+        return {"endpoint": f"{ARCSIGHT_GROUPSERVICE_ENDPOINT}/getChildIDByChildNameOrAlias", "json": request_data, "method": "post"}
+
+    def _find_children(self, group_id, case_names):
+        """
+        Look up the IDs of many children of a group with concurrent getChildIDByChildNameOrAlias calls.
+
+        :return: dictionary of the names looked up to their ID (empty when not present),
+            dictionary of the names that could not be looked up to the error message
+        """
+        case_ids = {}
+        errors = {}
+
+        for case_name, (call_act_res, resp) in zip(case_names, self._fan_out([self._get_child_id_call(group_id, name) for name in case_names])):
+            if resp is None:
+                errors[case_name] = call_act_res.get_message()
+            else:
+                case_ids[case_name] = _get_child_id(resp)
+
+        return case_ids, errors
+
+    def _get_group_cache(self):
+        """Group IDs and child names cached in the asset state, reset when the asset points to another manager or user."""
+
+        group_cache = self._state.get(ARCSIGHT_STATE_GROUP_CACHE)
+        owner = self._get_auth_owner()
+
+        if not isinstance(group_cache, dict) or group_cache.get("owner") != owner:
+            group_cache = {"owner": owner, "uris": {}, "children": {}}
+
+        # the callers update the cache in place
+        self._set_state(ARCSIGHT_STATE_GROUP_CACHE, group_cache)
+
+        return group_cache
 
-        return phantom.APP_SUCCESS, case_ids
+    def _get_group_id(self, group_uri, action_result):
+        """Resolve a group URI to its ID, the IDs are cached for 'group_cache_ttl' seconds."""
 
-    def _get_case(self, case_id, action_result):
+        group_cache = self._get_group_cache()
 
-        ret_val, case_details = self._get_case_details(case_id, action_result)
+        cached = group_cache["uris"].get(group_uri)
+        if cached and self._is_cache_fresh(cached[1], self._group_cache_ttl):
+            return phantom.APP_SUCCESS, cached[0]
+
+        ret_val, group_details = self._get_group_details(group_uri, action_result)
 
         if phantom.is_fail(ret_val):
-            self.save_progress(f"Ignoring Case ID: {case_id}, could not get details.")
-            return action_result.get_status(), None, None
+            return action_result.get_status(), None
 
-        self.send_progress(f"Processing Case ID: {case_id}")
+        group_id = group_details.get("resourceid")
 
-        # create a container
-        container = {
-            "source_data_identifier": case_id,
-            "name": case_details["name"],
-            "description": case_details.get("description"),
-            "data": {"case_detail": case_details},
-            "start_time": _get_str_from_epoch(case_details.get("createdTimestamp")),
-        }
+        if not group_id:
+            return action_result.set_status(phantom.APP_ERROR, f"Unable to get the group id of Group: '{group_uri}'"), None
 
-        event_ids = case_details.get("eventIDs")
+        if self._group_cache_ttl:
+            group_cache["uris"][group_uri] = [group_id, time.time()]
 
-        if not event_ids:
-            self.save_progress("Ignoring Case: {}({}) since it has no events".format(case_details["name"], case_id))
-            return action_result.get_status(), container, None
+        return phantom.APP_SUCCESS, group_id
 
-        # now get the events for this container
-        ret_val, events = self._get_case_events(case_details["eventIDs"], action_result)
+    def _get_child_index(self, group_id):
+        """
+        Get the names and aliases of the children of a group mapped to their IDs.
 
-        if phantom.is_fail(ret_val):
-            return action_result.get_status(), container, None
+        The index is prefetched with getAllChildren and kept for 'child_index_ttl' seconds.
 
-        artifacts = []
+        :return: dictionary of child name to ID, None when the index is disabled or could not be fetched
+        """
+        if not self._child_index_ttl:
+            return None
 
-        for i, event in enumerate(events):
-            self.send_progress("Processing Event ID: {}".format(event["eventId"]))
-            artifact = {
-                "source_data_identifier": event["eventId"],
-                "name": event.get("name", f"Artifact # {i}"),
-                "data": event,
-                "start_time": _get_str_from_epoch(event.get("startTime")),
-                "end_time": _get_str_from_epoch(event.get("endTime")),
-            }
+        children = self._get_group_cache()["children"]
 
-            cef = {}
-
-            # source details
-            source = event.get("source")
-            if source:
-                cef["sourceUserName"] = source.get("userName")
-                cef["sourceAddress"] = _to_ip(source.get("address"))
-                cef["sourceMacAddress"] = _to_mac(source.get("maxAddress"))
-                cef["sourcePort"] = _to_port(source.get("port"))
-                cef["sourceHostName"] = source.get("hostName")
-
-            # destination details
-            destination = event.get("destination")
-            if destination:
-                cef["destinationUserName"] = destination.get("userName")
-                cef["destinationAddress"] = _to_ip(destination.get("address"))
-                cef["destinationMacAddress"] = _to_mac(destination.get("maxAddress"))
-                cef["destinationPort"] = _to_port(destination.get("port"))
-                cef["destinationHostName"] = destination.get("hostName")
-
-            cef = {k: v for k, v in list(cef.items()) if v}
-
-            if not cef:
-                continue
+        cached = children.get(group_id)
+        if cached and self._is_cache_fresh(cached[0], self._child_index_ttl):
+            return cached[1]
 
-            artifact["cef"] = cef
+        endpoint = f"{ARCSIGHT_GROUPSERVICE_ENDPOINT}/getAllChildren"
 
-            artifacts.append(artifact)
+        request_data = {"gro.getAllChildren": {"gro.authToken": self._auth_token, "gro.groupId": group_id}}
 
-        return phantom.APP_SUCCESS, container, artifacts
+        index_act_res = ActionResult()
 
-    def _parse_results(self, results, param):
+        ret_val, resp = self._make_rest_call(endpoint, index_act_res, json=request_data, method="post")
 
-        container_count = param.get(phantom.APP_JSON_CONTAINER_COUNT, ARCSIGHT_DEFAULT_CONTAINER_COUNT)
-        artifact_count = param.get(phantom.APP_JSON_ARTIFACT_COUNT, ARCSIGHT_DEFAULT_ARTIFACT_COUNT)
+        if phantom.is_fail(ret_val):
+            self.debug_print(f"Unable to prefetch the children of group {group_id}. {index_act_res.get_message()}")
+            return None
 
-        results = results[:container_count]
+        try:
+            resources = resp.get("gro.getAllChildrenResponse", {}).get("gro.return", [])
+        except:
+            resources = []
 
-        for i, result in enumerate(results):
-            container = result.get("container")
+        if not resources:
+            resources = []
+        elif not isinstance(resources, list):
+            resources = [resources]
 
-            if not container:
+        child_index = {}
+        for resource in resources:
+            if not isinstance(resource, dict) or not resource.get("resourceid"):
                 continue
+            for key in ("alias", "name"):
+                if resource.get(key):
+                    child_index[resource[key]] = resource["resourceid"]
 
-            container.update(_container_common)
-
-            (ret_val, message, container_id) = self.save_container(container)
-            self.debug_print(f"save_container returns, value: {ret_val}, reason: {message}, id: {container_id}")
+        children[group_id] = [time.time(), child_index]
 
-            artifacts = result.get("artifacts")
-            if not artifacts:
-                continue
+        return child_index
 
-            artifacts = artifacts[:artifact_count]
+    def _find_child(self, group_id, case_name, action_result):
+        """Get the ID of the child of a group with the given name, from the prefetched index when there is one."""
 
-            len_artifacts = len(artifacts)
+        child_index = self._get_child_index(group_id)
 
-            for j, artifact in enumerate(artifacts):
-                if not artifact:
-                    continue
+        if child_index is not None:
+            return phantom.APP_SUCCESS, child_index.get(case_name)
 
-                # add the container id to the artifact
-                artifact["container_id"] = container_id
-                artifact.update(_artifact_common)
+        return self._get_child_id_by_name(group_id, case_name, action_result)
 
-                # if it is the last artifact of the last container
-                if (j + 1) == len_artifacts:
-                    # mark it such that active playbooks get executed
-                    artifact["run_automation"] = True
+    def _insert_case(self, group_id, case_name, action_result):
 
-                ret_val, status_string, artifact_id = self.save_artifact(artifact)
-                self.debug_print(f"save_artifact returns, value: {ret_val}, reason: {status_string}, id: {artifact_id}")
+        call = self._insert_case_call(group_id, case_name)
 
-        return self.set_status(phantom.APP_SUCCESS)
+        ret_val, resp = self._make_rest_call(call["endpoint"], action_result, json=call["json"], method="post")
 
-    def _ingest_cases(self, case_ids, param):
+        if phantom.is_fail(ret_val):
+            # the insert may have happened anyway, the prefetched names can no longer be trusted
+            self._get_group_cache()["children"].pop(group_id, None)
+            return action_result.get_status(), None
 
-        results = []
+        case_details = _get_inserted_case(resp)
 
-        for case_id in case_ids:
-            case_act_res = ActionResult()
+        self._index_children(group_id, {case_name: case_details.get("resourceid")})
 
-            ret_val, container, artifacts = self._get_case(case_id, case_act_res)
+        return phantom.APP_SUCCESS, case_details
 
-            if phantom.is_fail(ret_val):
-                continue
+    def _index_children(self, group_id, case_ids):
+        """Add the IDs of created cases to the prefetched child index of their group, if there is one."""
 
-            if container and artifacts:
-                results.append({"container": container, "artifacts": artifacts})
+        cached = self._get_group_cache()["children"].get(group_id)
 
-        self.send_progress("Done Processing Cases and Events")
+        if cached:
+            cached[1].update((case_name, case_id) for case_name, case_id in case_ids.items() if case_id)
 
-        self.save_progress("Ingesting results into Containers and Artifacts")
+    def _insert_case_call(self, group_id, case_name):
 
-        self._parse_results(results, param)
+        request_data = {"cas.insertResource": {"cas.authToken": self._auth_token, "cas.resource": {"name": case_name}, "cas.parentId": group_id}}
 
-        return phantom.APP_SUCCESS
+        return {"endpoint": f"{ARCSIGHT_CASESERVICE_ENDPOINT}/insertResource", "json": request_data, "method": "post"}
 
-    def _poll_now(self, param):
+    def _create_ticket(self, param):
 
         action_result = self.add_action_result(ActionResult(param))
 
         ret_val = self._login(action_result)
 
         if phantom.is_fail(ret_val):
+            self.save_progress(ARCSIGHT_ERR_UNABLE_TO_LOGIN)
             return action_result.get_status()
 
-        container_id = param.get(phantom.APP_JSON_CONTAINER_ID)
-
-        if container_id:
-            case_ids = param[phantom.APP_JSON_CONTAINER_ID]
-            case_ids = case_ids.split(",")
-        else:
-            ret_val, case_ids = self._get_all_case_ids(param, action_result)
-            if phantom.is_fail(ret_val):
-                return action_result.get_status()
-
-        self.debug_print("Case IDS:", case_ids)
-
-        self._ingest_cases(case_ids, param)
-
-        return action_result.set_status(phantom.APP_SUCCESS)
-
-    def _on_poll(self, param):
+        parent_group = _get_group_uri(param.get(ARCSIGHT_JSON_PARENT_GROUP, ARCSIGHT_DEFAULT_PARENT_GROUP))
 
-        action_result = self.add_action_result(ActionResult(param))
+        case_name = param[ARCSIGHT_JSON_CASE_NAME]
 
-        ret_val = self._login(action_result)
+        # First get the id of the group
+        ret_val, group_id = self._get_group_id(parent_group, action_result)
 
         if phantom.is_fail(ret_val):
-            self.save_progress("On Poll Action Failed")
             return action_result.get_status()
 
-        self.save_progress("On Poll Action Passed")
-        return action_result.set_status(phantom.APP_ERROR)
+        self.save_progress(f"Got parent group ID: {group_id}")
 
-    def _test_connectivity(self, param):
+        # init the summary as if the case was created
+        summary = action_result.set_summary({"case_created": True})
 
-        action_result = self.add_action_result(ActionResult(param))
+        # Try to see if there is already a case with that name
 
-        ret_val = self._login(action_result)
+        ret_val, case_id = self._find_child(group_id, case_name, action_result)
 
         if phantom.is_fail(ret_val):
-            self.save_progress("Test Connectivity Failed")
             return action_result.get_status()
 
-        self.save_progress("Test Connectivity Passed")
-
-        return action_result.set_status(phantom.APP_SUCCESS)
-
-    def _get_group_details(self, group_uri, action_result):
+        if not case_id:
+            # Child not present, let's insert it
+            ret_val, case_details = self._insert_case(group_id, case_name, action_result)
 
-        endpoint = f"{ARCSIGHT_GROUPSERVICE_ENDPOINT}/getGroupByURI"
+            if phantom.is_success(ret_val):
+                case_id = case_details.get("resourceid")
 
-        request_data = {"gro.getGroupByURI": {"gro.authToken": self._auth_token, "gro.uri": group_uri}}
+                if case_id:
+                    summary["case_id"] = case_id
 
-        ret_val, resp = self._make_rest_call(endpoint, action_result, json=request_data, method="post")
+                action_result.add_data(case_details)
 
-        if phantom.is_fail(ret_val):
-            return phantom.APP_ERROR, {}
+                return action_result.set_status(phantom.APP_SUCCESS, "New case created")
 
-        try:
-            group_details = resp.get("gro.getGroupByURIResponse", {}).get("gro.return", {})
-        except:
-            group_details = {}
+            summary["case_created"] = False
 
-        return phantom.APP_SUCCESS, group_details
+            # the cached group ID or case names may be stale, ask the manager before giving up
+            self._get_group_cache()["uris"].pop(parent_group, None)
 
-    def _get_child_id_by_name(self, parent_group_id, case_name, action_result):
+            ret_val, group_id = self._get_group_id(parent_group, ActionResult())
 
-        # Child not present, let's insert it
-        endpoint = f"{ARCSIGHT_GROUPSERVICE_ENDPOINT}/getChildIDByChildNameOrAlias"
+            if phantom.is_fail(ret_val):
+                return action_result.get_status()
 
-        request_data = {
-            "gro.getChildIDByChildNameOrAlias": {"gro.authToken": self._auth_token, "gro.groupId": parent_group_id, "gro.name": case_name}
-        }
+            ret_val, case_id = self._get_child_id_by_name(group_id, case_name, ActionResult())
 
-        ret_val, resp = self._make_rest_call(endpoint, action_result, json=request_data, method="post")
+            if phantom.is_fail(ret_val) or not case_id:
+                return action_result.get_status()
 
+        # Child is already present
+        summary["case_created"] = False
+        ret_val, cases_details, _ = self._get_cached_cases([case_id], action_result)
         if phantom.is_fail(ret_val):
-            return action_result.get_status(), None
+            action_result.append_to_message(ARCSIGHT_ERR_UNABLE_TO_GET_CASE_INFO)
+            return action_result.get_status()
+        case_details = cases_details.get(case_id, {})
+        case_id = case_details.get("resourceid")
 
-        try:
-            case_id = resp.get("gro.getChildIDByChildNameOrAliasResponse", {}).get("gro.return", {})
-        except:
-            # If the case is not present, the response ....Response is not a dict
-            case_id = None
+        if case_id:
+            summary["case_id"] = case_id
 
-        return phantom.APP_SUCCESS, case_id
+        action_result.add_data(case_details)
+        return action_result.set_status(phantom.APP_SUCCESS, "Case already existed")
 
-    def _create_ticket(self, param):
+    def _bulk_create_ticket(self, param):
 
         action_result = self.add_action_result(ActionResult(param))
 
@@ -657,79 +2426,95 @@ class ArcsightConnector(BaseConnector):
             self.save_progress(ARCSIGHT_ERR_UNABLE_TO_LOGIN)
             return action_result.get_status()
 
-        parent_group = param.get(ARCSIGHT_JSON_PARENT_GROUP, ARCSIGHT_DEFAULT_PARENT_GROUP)
-
-        if not parent_group.startswith("/"):
-            parent_group = f"/{parent_group}"
+        parent_group = _get_group_uri(param.get(ARCSIGHT_JSON_PARENT_GROUP, ARCSIGHT_DEFAULT_PARENT_GROUP))
 
-        parent_group = parent_group.rstrip("/")
+        # the same name twice is the same case
+        case_names = list(dict.fromkeys(name.strip() for name in param[ARCSIGHT_JSON_CASE_NAMES].split(",") if name.strip()))
 
-        case_name = param[ARCSIGHT_JSON_CASE_NAME]
+        if not case_names:
+            return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_NO_CASE_NAMES)
 
-        # First get the id of the group
-        ret_val, group_details = self._get_group_details(parent_group, action_result)
+        ret_val, group_id = self._get_group_id(parent_group, action_result)
 
         if phantom.is_fail(ret_val):
             return action_result.get_status()
 
-        group_id = group_details.get("resourceid")
+        self.save_progress(f"Got parent group ID: {group_id}")
 
-        if not group_id:
-            return action_result.set_status(phantom.APP_ERROR, f"Unable to get the group id of Group: '{parent_group}'")
+        rows = {name: {"name": name, "case_created": False, "case_id": None, "status": "success"} for name in case_names}
 
-        self.save_progress(f"Got parent group ID: {group_id}")
+        # Try to see which cases already exist
+        child_index = self._get_child_index(group_id)
 
-        # init the summary as if the case was created
-        summary = action_result.set_summary({"case_created": True})
+        if child_index is not None:
+            case_ids, errors = {name: child_index.get(name) for name in case_names}, {}
+        else:
+            case_ids, errors = self._find_children(group_id, case_names)
 
-        # Try to see if there is already a case with that name
+        for case_name, message in errors.items():
+            rows[case_name].update({"status": "failed", "message": message})
 
-        ret_val, case_id = self._get_child_id_by_name(group_id, case_name, action_result)
+        for case_name, case_id in case_ids.items():
+            if case_id:
+                rows[case_name].update({"case_id": case_id, "message": "Case already existed"})
 
-        if phantom.is_fail(ret_val):
-            return action_result.get_status()
+        # Children not present, let's insert them
+        missing = [name for name, case_id in case_ids.items() if not case_id]
 
-        if case_id:
-            # Child is already present
-            summary["case_created"] = False
-            ret_val, case_details = self._get_case_details(case_id, action_result)
-            if phantom.is_fail(ret_val):
-                action_result.append_to_message(ARCSIGHT_ERR_UNABLE_TO_GET_CASE_INFO)
-                return action_result.get_status()
-            case_id = case_details.get("resourceid")
+        self.save_progress(f"Creating {len(missing)} case(s)")
 
-            if case_id:
-                summary["case_id"] = case_id
+        failed = {}
 
-            action_result.add_data(case_details)
-            return action_result.set_status(phantom.APP_SUCCESS, "Case already existed")
+        if missing:
+            for case_name, (call_act_res, resp) in zip(missing, self._fan_out([self._insert_case_call(group_id, name) for name in missing])):
+                if resp is None:
+                    failed[case_name] = call_act_res.get_message()
+                    continue
 
-        # Child not present, let's insert it
-        endpoint = f"{ARCSIGHT_CASESERVICE_ENDPOINT}/insertResource"
+                rows[case_name].update(
+                    {"case_created": True, "case_id": _get_inserted_case(resp).get("resourceid"), "message": "New case created"}
+                )
 
-        request_data = {"cas.insertResource": {"cas.authToken": self._auth_token, "cas.resource": {"name": case_name}, "cas.parentId": group_id}}
+            self._index_children(group_id, {name: rows[name]["case_id"] for name in missing if rows[name]["case_created"]})
 
-        ret_val, resp = self._make_rest_call(endpoint, action_result, json=request_data, method="post")
+        if failed:
+            # the failed inserts may have happened anyway, and the cached group ID or case names may be stale,
+            # ask the manager before giving up
+            group_cache = self._get_group_cache()
+            group_cache["children"].pop(group_id, None)
+            group_cache["uris"].pop(parent_group, None)
 
-        if phantom.is_fail(ret_val):
-            summary["case_created"] = False
-            return action_result.get_status()
+            ret_val, group_id = self._get_group_id(parent_group, ActionResult())
 
-        summary["case_created"] = True
+            case_ids = self._find_children(group_id, list(failed))[0] if phantom.is_success(ret_val) else {}
 
-        try:
-            case_details = resp.get("cas.insertResourceResponse", {}).get("cas.return", {})
-        except:
-            case_details = {}
+            for case_name, message in failed.items():
+                if case_ids.get(case_name):
+                    rows[case_name].update({"case_id": case_ids[case_name], "message": "Case already existed"})
+                else:
+                    rows[case_name].update({"status": "failed", "message": message})
 
-        case_id = case_details.get("resourceid")
+        for row in rows.values():
+            action_result.add_data(row)
 
-        if case_id:
-            summary["case_id"] = case_id
+        created = sum(row["case_created"] for row in rows.values())
+        failed_cases = sum(row["status"] == "failed" for row in rows.values())
 
-        action_result.add_data(case_details)
+        action_result.update_summary(
+            {
+                "total_cases": len(rows),
+                "created_cases": created,
+                "existing_cases": len(rows) - created - failed_cases,
+                "failed_cases": failed_cases,
+            }
+        )
+
+        if failed_cases == len(rows):
+            return action_result.set_status(phantom.APP_ERROR, f"Unable to create any of the {len(rows)} case(s)")
 
-        return action_result.set_status(phantom.APP_SUCCESS, "New case created")
+        return action_result.set_status(
+            phantom.APP_SUCCESS, f"Created {created} case(s), {len(rows) - created - failed_cases} already existed, {failed_cases} failed"
+        )
 
     def _update_ticket(self, param):
 
@@ -751,6 +2536,9 @@ class ArcsightConnector(BaseConnector):
             error_msg = self._get_error_message_from_exception(e)
             return action_result.set_status(phantom.APP_ERROR, f"Unable to load the input 'update_fields' json. {error_msg}")
 
+        if not isinstance(update_fields, dict):
+            return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_UPDATE_FIELDS_NOT_DICT)
+
         # Get the case info
         case_id = param[ARCSIGHT_JSON_CASE_ID]
         ret_val, case_details = self._get_case_details(case_id, action_result)
@@ -759,28 +2547,163 @@ class ArcsightConnector(BaseConnector):
             action_result.append_to_message(ARCSIGHT_ERR_UNABLE_TO_GET_CASE_INFO)
             return action_result.get_status()
 
-        # update the dictionary that we got with the one that was inputted
-        case_details.update(update_fields)
+        [(update_act_res, case_details, case_updated)] = self._update_cases([(case_details, update_fields)])
+
+        if case_details is None:
+            return action_result.set_status(phantom.APP_ERROR, update_act_res.get_message())
 
-        request_data = {"cas.update": {"cas.authToken": self._auth_token, "cas.resource": case_details}}
+        action_result.add_data(case_details)
 
-        endpoint = f"{ARCSIGHT_CASESERVICE_ENDPOINT}/update"
+        action_result.update_summary({"case_id": case_details.get("resourceid"), "case_updated": case_updated})
 
-        ret_val, resp = self._make_rest_call(endpoint, action_result, json=request_data, method="post")
+        if not case_updated:
+            return action_result.set_status(phantom.APP_SUCCESS, ARCSIGHT_MSG_CASE_UNCHANGED)
+
+        return action_result.set_status(phantom.APP_SUCCESS)
+
+    def _update_cases(self, updates):
+        """
+        Write the updates of many cases with concurrent CaseService/update calls.
+
+        Only the fields that differ from the current case details are sent, along with the fields that identify
+        the case (the whole case with 'minimal_update' off). A case with no differing field is not written.
+
+        :param updates: list of (case details, fields to update)
+        :return: list of (ActionResult of the call, updated case details or None, whether the case was written),
+            in the order of updates
+        """
+        results = [None] * len(updates)
+        calls = []
+        written = []
+
+        for i, (case_details, update_fields) in enumerate(updates):
+            changed_fields = {key: value for key, value in update_fields.items() if key not in case_details or case_details[key] != value}
+
+            if not changed_fields:
+                unchanged_act_res = ActionResult()
+                unchanged_act_res.set_status(phantom.APP_SUCCESS, ARCSIGHT_MSG_CASE_UNCHANGED)
+                results[i] = (unchanged_act_res, case_details, False)
+                continue
+
+            if self._minimal_update:
+                resource = {key: case_details[key] for key in ARCSIGHT_CASE_IDENTITY_FIELDS if key in case_details}
+            else:
+                resource = dict(case_details)
+
+            # update the dictionary that we got with the one that was inputted
+            resource.update(changed_fields)
+
+            request_data = {"cas.update": {"cas.authToken": self._auth_token, "cas.resource": resource}}
+
+            calls.append({"endpoint": f"{ARCSIGHT_CASESERVICE_ENDPOINT}/update", "json": request_data, "method": "post"})
+            written.append(i)
+
+        # the cached details of the written cases are out of date, even when the write failed
+        case_cache = self._get_case_cache()
+        if case_cache is not None:
+            case_cache.delete_many(updates[i][0].get("resourceid") for i in written)
+
+        for i, (update_act_res, resp) in zip(written, self._fan_out(calls)):
+            if resp is None:
+                results[i] = (update_act_res, None, True)
+                continue
+
+            try:
+                case_details = resp.get("cas.updateResponse", {}).get("cas.return", {})
+            except:
+                case_details = {}
+
+            results[i] = (update_act_res, case_details, True)
+
+        return results
+
+    def _bulk_update_ticket(self, param):
+
+        action_result = self.add_action_result(ActionResult(param))
+
+        ret_val = self._login(action_result)
 
         if phantom.is_fail(ret_val):
-            return phantom.APP_ERROR, {}
+            self.save_progress(ARCSIGHT_ERR_UNABLE_TO_LOGIN)
+            return action_result.get_status()
 
+        # Validate the fields param json
         try:
-            case_details = resp.get("cas.updateResponse", {}).get("cas.return", {})
-        except:
-            case_details = {}
+            update_fields = json.loads(param[ARCSIGHT_JSON_UPDATE_FIELDS])
+        except Exception as e:
+            error_msg = self._get_error_message_from_exception(e)
+            return action_result.set_status(phantom.APP_ERROR, f"Unable to load the input 'update_fields' json. {error_msg}")
 
-        action_result.add_data(case_details)
+        if not isinstance(update_fields, dict):
+            return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_UPDATE_FIELDS_NOT_DICT)
 
-        action_result.update_summary({"case_id": case_details.get("resourceid")})
+        case_ids = list(dict.fromkeys(case_id.strip() for case_id in param.get(ARCSIGHT_JSON_CASE_IDS, "").split(",") if case_id.strip()))
 
-        return action_result.set_status(phantom.APP_SUCCESS)
+        per_case = _is_per_case_update(update_fields)
+
+        if per_case and not case_ids:
+            case_ids = list(update_fields)
+        elif per_case and set(case_ids) != set(update_fields):
+            # never write the per-case mapping itself to the cases it does not cover
+            return action_result.set_status(
+                phantom.APP_ERROR,
+                ARCSIGHT_ERR_UPDATE_FIELDS_IDS_MISMATCH.format(
+                    missing=", ".join(case_id for case_id in case_ids if case_id not in update_fields) or "none",
+                    extra=", ".join(case_id for case_id in update_fields if case_id not in case_ids) or "none",
+                ),
+            )
+
+        if not case_ids:
+            return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_NO_CASE_IDS)
+
+        # read all the cases first, then write them concurrently
+        self.save_progress(f"Getting {len(case_ids)} case(s)")
+
+        _, cases_details, read_errors = self._get_cases_details(case_ids, ActionResult())
+
+        rows = {case_id: {"case_id": case_id, "status": "success"} for case_id in case_ids}
+
+        updates = []
+        for case_id in case_ids:
+            case_details = cases_details.get(case_id)
+
+            if not case_details:
+                rows[case_id].update({"status": "failed", "message": read_errors.get(case_id) or ARCSIGHT_ERR_CASE_NOT_FOUND})
+                continue
+
+            updates.append((case_id, case_details, update_fields[case_id] if per_case else update_fields))
+
+        self.save_progress(f"Updating {len(updates)} case(s)")
+
+        results = self._update_cases([(case_details, fields) for _, case_details, fields in updates])
+
+        unchanged_cases = 0
+
+        for (case_id, _, _), (update_act_res, case_details, case_updated) in zip(updates, results):
+            if case_details is None:
+                rows[case_id].update({"status": "failed", "message": update_act_res.get_message()})
+                continue
+
+            unchanged_cases += not case_updated
+
+            rows[case_id].update({"name": case_details.get("name"), "message": "Case updated" if case_updated else ARCSIGHT_MSG_CASE_UNCHANGED})
+
+        for row in rows.values():
+            action_result.add_data(row)
+
+        failed_cases = sum(row["status"] == "failed" for row in rows.values())
+        updated_cases = len(rows) - failed_cases - unchanged_cases
+
+        action_result.update_summary(
+            {"total_cases": len(rows), "updated_cases": updated_cases, "unchanged_cases": unchanged_cases, "failed_cases": failed_cases}
+        )
+
+        if failed_cases == len(rows):
+            return action_result.set_status(phantom.APP_ERROR, f"Unable to update any of the {len(rows)} case(s)")
+
+        return action_result.set_status(
+            phantom.APP_SUCCESS, f"Updated {updated_cases} case(s), {unchanged_cases} already up to date, {failed_cases} failed"
+        )
 
     def _get_ticket(self, param):
 
@@ -793,16 +2716,31 @@ class ArcsightConnector(BaseConnector):
             return action_result.get_status()
 
         # Get the case info
-        case_id = param[ARCSIGHT_JSON_CASE_ID]
-        ret_val, case_details = self._get_case_details(case_id, action_result)
+        case_ids = list(dict.fromkeys(case_id.strip() for case_id in param[ARCSIGHT_JSON_CASE_ID].split(",") if case_id.strip()))
+
+        if not case_ids:
+            return action_result.set_status(phantom.APP_ERROR, ARCSIGHT_ERR_NO_CASE_ID)
+
+        ret_val, cases_details, cache_hits = self._get_cached_cases(case_ids, action_result)
 
         if phantom.is_fail(ret_val):
             action_result.append_to_message(ARCSIGHT_ERR_UNABLE_TO_GET_CASE_INFO)
             return action_result.get_status()
 
-        action_result.add_data(case_details)
+        found_ids = [case_id for case_id in case_ids if case_id in cases_details]
+        missing_ids = [case_id for case_id in case_ids if case_id not in cases_details]
 
-        action_result.update_summary({"case_id": case_details.get("resourceid")})
+        for case_id in found_ids:
+            action_result.add_data(cases_details[case_id])
+
+        if len(case_ids) == 1 and found_ids:
+            action_result.update_summary({"case_id": cases_details[case_ids[0]].get("resourceid")})
+
+        action_result.update_summary({"total_cases": len(found_ids), "missing_cases": len(missing_ids), "cache_hits": cache_hits})
+
+        if missing_ids:
+            message = ARCSIGHT_ERR_CASES_NOT_FOUND.format(count=len(missing_ids), case_ids=", ".join(missing_ids))
+            return action_result.set_status(phantom.APP_SUCCESS if found_ids else phantom.APP_ERROR, message)
 
         return action_result.set_status(phantom.APP_SUCCESS)
 
@@ -832,40 +2770,95 @@ class ArcsightConnector(BaseConnector):
 
         # Range
         mini, maxi = (int(x) for x in result_range.split("-"))
-        request_data = {
-            "mss.search": {
-                "mss.authToken": self._auth_token,
-                "mss.queryStr": query_string,
-                "mss.startPosition": mini,
-                "mss.pageSize": (maxi - mini) + 1,
-            }
-        }
 
-        endpoint = f"{ARCSIGHT_MANAGERSEARCHSERVICE_ENDPOINT}/search"
+        query_cache = None
+        if self._query_cache_ttl:
+            query_cache = DirectoryCache(
+                os.path.join(self.get_state_dir(), ARCSIGHT_QUERY_CACHE_DIR.format(asset_id=self.get_asset_id())), self._query_cache_size
+            )
 
-        ret_val, resp = self._make_rest_call(endpoint, action_result, json=request_data, method="post")
+            # the same search with different spacing is the same query
+            query_cache_key = f"{mini}-{maxi} {' '.join(query_string.split())}"
 
-        if phantom.is_fail(ret_val):
-            return phantom.APP_ERROR, {}
+            if not param.get(ARCSIGHT_JSON_BYPASS_CACHE, False):
+                cached = query_cache.get(query_cache_key)
+                if cached is not None:
+                    cached_at, search_result = cached
+                    cache_age = int(time.time() - cached_at)
+                    if 0 <= cache_age < self._query_cache_ttl:
+                        action_result.add_data(search_result)
+                        action_result.update_summary(
+                            {
+                                "total_items": search_result.get("hitCount"),
+                                "total_items_returned": len(search_result["searchHits"]),
+                                "cache_hit": True,
+                                "cache_age": cache_age,
+                            }
+                        )
+                        return action_result.set_status(phantom.APP_SUCCESS)
+
+        # the first page tells how many hits there are, the rest of the range is capped by it
+        page_size = min(self._search_page_size, (maxi - mini) + 1)
+
+        page_act_res, resp = self._rest_call(self._search_call(query_string, mini, page_size))
+
+        if resp is None:
+            return action_result.set_status(phantom.APP_ERROR, page_act_res.get_message())
+
+        search_result = _get_search_result(resp)
+
+        search_hits = search_result["searchHits"]
 
         try:
-            search_result = resp.get("mss.searchResponse", {}).get("mss.return", {})
-        except:
-            search_result = {}
+            hit_count = int(search_result.get("hitCount"))
+        except (TypeError, ValueError):
+            hit_count = None
+
+        last = maxi if hit_count is None else min(maxi, hit_count - 1)
+
+        if len(search_hits) == page_size and mini + page_size <= last:
+            starts = list(range(mini + page_size, last + 1, self._search_page_size))
 
-        search_hits = search_result.get("searchHits", [])
+            pages = self._fan_out([self._search_call(query_string, start, min(self._search_page_size, last - start + 1)) for start in starts])
 
-        if not isinstance(search_hits, list):
-            search_result["searchHits"] = [search_hits]
-            # this variable is used downstream, so set it up again
-            search_hits = search_result.get("searchHits", [])
+            for page_act_res, resp in pages:
+                if resp is None:
+                    return action_result.set_status(phantom.APP_ERROR, page_act_res.get_message())
+
+                page_result = _get_search_result(resp)
+                search_hits.extend(page_result["searchHits"])
+
+                # a short page means the end of the hits was reached
+                if len(page_result["searchHits"]) < self._search_page_size:
+                    break
 
         action_result.add_data(search_result)
 
         action_result.update_summary({"total_items": search_result.get("hitCount"), "total_items_returned": len(search_hits)})
 
+        if query_cache is not None:
+            action_result.update_summary({"cache_hit": False, "cache_age": 0})
+
+            try:
+                query_cache.put(query_cache_key, [time.time(), search_result])
+            except OSError as e:
+                self.debug_print(f"Unable to save the query cache: {self._get_error_message_from_exception(e)}")
+
         return action_result.set_status(phantom.APP_SUCCESS)
 
+    def _search_call(self, query_string, start, page_size):
+
+        request_data = {
+            "mss.search": {
+                "mss.authToken": self._auth_token,
+                "mss.queryStr": query_string,
+                "mss.startPosition": start,
+                "mss.pageSize": page_size,
+            }
+        }
+
+        return {"endpoint": f"{ARCSIGHT_MANAGERSEARCHSERVICE_ENDPOINT}/search", "json": request_data, "method": "post"}
+
     def handle_action(self, param):
         """
         Get current action identifier and call member function of its own to handle the action.
@@ -880,12 +2873,28 @@ class ArcsightConnector(BaseConnector):
             result = self._test_connectivity(param)
         elif action == ACTION_ID_CREATE_TICKET:
             result = self._create_ticket(param)
+        elif action == ACTION_ID_BULK_CREATE_TICKET:
+            result = self._bulk_create_ticket(param)
         elif action == ACTION_ID_UPDATE_TICKET:
             result = self._update_ticket(param)
+        elif action == ACTION_ID_BULK_UPDATE_TICKET:
+            result = self._bulk_update_ticket(param)
         elif action == ACTION_ID_GET_TICKET:
             result = self._get_ticket(param)
         elif action == ACTION_ID_RUN_QUERY:
             result = self._run_query(param)
+        elif action == ACTION_ID_ON_POLL:
+            if self.is_poll_now():
+                result = self._poll_now(param)
+            else:
+                result = self._on_poll(param)
+
+        metrics = self._metrics.report() if self._metrics is not None else None
+
+        for action_result in self.get_action_results():
+            action_result.update_summary({"retries": self._retries, "throttle_delay": round(self._throttle_delay, 3)})
+            if metrics is not None:
+                action_result.update_summary({"metrics": metrics})
 
         return result
 
@@ -6,14 +6,19 @@
 
 # Action ID keys
 ACTION_ID_CREATE_TICKET = "create_ticket"
+ACTION_ID_BULK_CREATE_TICKET = "bulk_create_ticket"
 ACTION_ID_UPDATE_TICKET = "update_ticket"
+ACTION_ID_BULK_UPDATE_TICKET = "bulk_update_ticket"
 ACTION_ID_GET_TICKET = "get_ticket"
 ACTION_ID_RUN_QUERY = "run_query"
+ACTION_ID_ON_POLL = "on_poll"
 
 # JSON keys
 ARCSIGHT_JSON_BASE_URL = "base_url"
 ARCSIGHT_JSON_CASE_NAME = "name"
+ARCSIGHT_JSON_CASE_NAMES = "names"
 ARCSIGHT_JSON_CASE_ID = "id"
+ARCSIGHT_JSON_CASE_IDS = "ids"
 ARCSIGHT_JSON_PARENT_GROUP = "parent_group"
 ARCSIGHT_JSON_USERNAME = "username"
 ARCSIGHT_JSON_PASSWORD = "password"  # pragma: allowlist secret
@@ -21,6 +26,47 @@ ARCSIGHT_JSON_UPDATE_FIELDS = "update_fields"
 ARCSIGHT_JSON_QUERY = "query"
 ARCSIGHT_JSON_TYPE = "type"
 ARCSIGHT_JSON_RANGE = "range"
+ARCSIGHT_JSON_POOL_SIZE = "pool_size"
+ARCSIGHT_JSON_MAX_CONNECTION_REUSE = "max_connection_reuse"
+ARCSIGHT_JSON_TOKEN_TTL = "token_ttl"
+ARCSIGHT_JSON_MAX_CONCURRENCY = "max_concurrency"
+ARCSIGHT_JSON_EVENT_BATCH_SIZE = "event_batch_size"
+ARCSIGHT_JSON_ARTIFACT_BATCH_SIZE = "artifact_batch_size"
+ARCSIGHT_JSON_EVENT_CACHE_SIZE = "event_cache_size"
+ARCSIGHT_JSON_PERSIST_EVENT_CACHE = "persist_event_cache"
+ARCSIGHT_JSON_SEARCH_PAGE_SIZE = "search_page_size"
+ARCSIGHT_JSON_QUERY_CACHE_TTL = "query_cache_ttl"
+ARCSIGHT_JSON_QUERY_CACHE_SIZE = "query_cache_size"
+ARCSIGHT_JSON_BYPASS_CACHE = "bypass_cache"
+ARCSIGHT_JSON_ASYNC_TRANSPORT = "async_transport"
+ARCSIGHT_JSON_MAX_ASYNC_REQUESTS = "max_async_requests"
+ARCSIGHT_JSON_MAX_RETRIES = "max_retries"
+ARCSIGHT_JSON_RETRY_BACKOFF = "retry_backoff"
+ARCSIGHT_JSON_RATE_LIMIT = "rate_limit"
+ARCSIGHT_JSON_CIRCUIT_BREAKER_THRESHOLD = "circuit_breaker_threshold"
+ARCSIGHT_JSON_CIRCUIT_BREAKER_TIMEOUT = "circuit_breaker_timeout"
+ARCSIGHT_JSON_GROUP_CACHE_TTL = "group_cache_ttl"
+ARCSIGHT_JSON_CHILD_INDEX_TTL = "child_index_ttl"
+ARCSIGHT_JSON_MINIMAL_UPDATE = "minimal_update"
+ARCSIGHT_JSON_CASE_CACHE_TTL = "case_cache_ttl"
+ARCSIGHT_JSON_COLLECT_METRICS = "collect_metrics"
+ARCSIGHT_JSON_METRICS_FILE = "metrics_file"
+ARCSIGHT_JSON_DEBUG_CAPTURE = "debug_capture"
+ARCSIGHT_JSON_DEBUG_CAPTURE_CALL_BYTES = "debug_capture_call_bytes"
+ARCSIGHT_JSON_DEBUG_CAPTURE_ACTION_BYTES = "debug_capture_action_bytes"
+ARCSIGHT_JSON_REPLAY_MODE = "replay_mode"
+ARCSIGHT_JSON_REPLAY_FILE = "replay_file"
+ARCSIGHT_JSON_REPLAY_TIMING = "replay_timing"
+
+# State keys
+ARCSIGHT_STATE_AUTH_TOKEN = "auth_token"
+ARCSIGHT_STATE_AUTH_OWNER = "auth_owner"
+ARCSIGHT_STATE_AUTH_TIMESTAMP = "auth_timestamp"
+ARCSIGHT_STATE_ESM_VERSION = "esm_version"
+ARCSIGHT_STATE_ESM_VERSION_TIMESTAMP = "esm_version_timestamp"
+ARCSIGHT_STATE_CASE_INDEX = "case_index"
+ARCSIGHT_STATE_CIRCUIT_BREAKER = "circuit_breaker"
+ARCSIGHT_STATE_GROUP_CACHE = "group_cache"
 
 # Status messages for success or failure
 ARCSIGHT_SUCC_CONNECTIVITY_TEST = "Connectivity test passed"
@@ -30,8 +76,34 @@ ARCSIGHT_ERR_UNABLE_TO_PARSE_REPLY = "Unable to parse reply"
 ARCSIGHT_ERR_SERVER_CONNECTION = "Connection failed"
 ARCSIGHT_ERR_UNABLE_TO_LOGIN = "Unable to Login"
 ARCSIGHT_ERR_UNABLE_TO_GET_CASE_INFO = "Unable to get case information, cannot continue"
+ARCSIGHT_ERR_INVALID_INT = "Please provide a valid integer value in the '{key}' parameter"
+ARCSIGHT_ERR_NEGATIVE_INT = "Please provide a valid non-negative integer value in the '{key}' parameter"
+ARCSIGHT_ERR_STATE_FILE_CORRUPT = (
+    "Error occurred while loading the state file due to its unexpected format. Resetting the state file with the default format"
+)
+ARCSIGHT_ERR_NON_ZERO_INT = "Please provide a valid non-zero positive integer value in the '{key}' parameter"
+ARCSIGHT_ERR_NO_CASE_NAMES = "Please provide at least one case name in the 'names' parameter"
+ARCSIGHT_ERR_NO_CASE_ID = "Please provide at least one case ID in the 'id' parameter"
+ARCSIGHT_ERR_NO_CASE_IDS = (
+    "Please provide at least one case ID in the 'ids' parameter, or the fields of each case ID in the 'update_fields' parameter"
+)
+ARCSIGHT_ERR_UPDATE_FIELDS_NOT_DICT = "The input 'update_fields' json should be a dictionary"
+ARCSIGHT_ERR_UPDATE_FIELDS_IDS_MISMATCH = (
+    "The case IDs of the per-case 'update_fields' json should be the ones of the 'ids' parameter. "
+    "Case IDs without fields: {missing}. Fields of case IDs not in 'ids': {extra}"
+)
+ARCSIGHT_ERR_CASES_NOT_FOUND = "Unable to get {count} case(s): {case_ids}"
+ARCSIGHT_ERR_CASE_NOT_FOUND = "Unable to get the case information"
+ARCSIGHT_ERR_INVALID_DEBUG_CAPTURE = "Please provide one of {levels} in the 'debug_capture' parameter"
+ARCSIGHT_ERR_INVALID_REPLAY_MODE = "Please provide one of {modes} in the 'replay_mode' parameter"
+ARCSIGHT_ERR_REPLAY_FILE = "Unable to read the replay file {path}. {error}"
+ARCSIGHT_ERR_NO_RECORDED_REPLY = "No recorded reply for this {operation} request"
+ARCSIGHT_MSG_REPLAY_NO_ASYNC_TRANSPORT = "The async transport is not used to record or replay, using the thread pool"
+ARCSIGHT_ERR_CIRCUIT_OPEN = "The ESM manager failed too many calls in a row, not calling it until the circuit breaker timeout passes"
+ARCSIGHT_ERR_ASYNC_TRANSPORT_UNAVAILABLE = "The aiohttp module is not installed, using threads instead of the async transport"
 
 # Progress messages
+ARCSIGHT_MSG_CASE_UNCHANGED = "Case already up to date, nothing to update"
 
 # Endpoints
 ARCSIGHT_LIST_SERVICES_ENDPOINT = "/www/manager-service/services/listServices"
@@ -48,7 +120,91 @@ ARCSIGHT_DEFAULT_CONTAINER_COUNT = 10
 ARCSIGHT_DEFAULT_ARTIFACT_COUNT = 100
 ARCSIGHT_64VAL_NOT_FILLED = -9223372036854775808
 ARCSIGHT_32VAL_NOT_FILLED = -2147483648
+ARCSIGHT_CONVERSION_CACHE_SIZE = 4096
 ARCSIGHT_DEFAULT_PARENT_GROUP = "/All Cases/All Cases"
+ARCSIGHT_DEFAULT_POOL_SIZE = 10
+ARCSIGHT_DEFAULT_MAX_CONNECTION_REUSE = 0
+ARCSIGHT_DEFAULT_TOKEN_TTL = 600
+ARCSIGHT_CASE_DETAILS_BATCH_SIZE = 100
+ARCSIGHT_DEFAULT_MAX_CONCURRENCY = 5
+ARCSIGHT_DEFAULT_EVENT_BATCH_SIZE = 100
+ARCSIGHT_DEFAULT_ARTIFACT_BATCH_SIZE = 100
+ARCSIGHT_DEFAULT_EVENT_CACHE_SIZE = 10000
+ARCSIGHT_EVENT_CACHE_FILE = "{asset_id}_event_cache.json"
+ARCSIGHT_DEFAULT_SEARCH_PAGE_SIZE = 500
+ARCSIGHT_DEFAULT_QUERY_CACHE_TTL = 0
+ARCSIGHT_DEFAULT_QUERY_CACHE_SIZE = 100
+ARCSIGHT_QUERY_CACHE_DIR = "{asset_id}_query_cache"
+ARCSIGHT_DEFAULT_MAX_ASYNC_REQUESTS = 100
+ARCSIGHT_DEFAULT_MAX_RETRIES = 3
+ARCSIGHT_DEFAULT_RETRY_BACKOFF = 1
+ARCSIGHT_DEFAULT_RATE_LIMIT = 0
+ARCSIGHT_DEFAULT_CIRCUIT_BREAKER_THRESHOLD = 5
+ARCSIGHT_DEFAULT_CIRCUIT_BREAKER_TIMEOUT = 60
+ARCSIGHT_MAX_RETRY_DELAY = 30
+ARCSIGHT_RATE_LIMIT_FILE = "{asset_id}_rate_limit.json"
+ARCSIGHT_DEFAULT_GROUP_CACHE_TTL = 86400
+ARCSIGHT_DEFAULT_CHILD_INDEX_TTL = 0
+ARCSIGHT_DEFAULT_CASE_CACHE_TTL = 0
+ARCSIGHT_DEFAULT_CASE_CACHE_SIZE = 1000
+ARCSIGHT_CASE_CACHE_FILE = "{asset_id}_case_cache.json"
+ARCSIGHT_DEFAULT_DEBUG_CAPTURE_CALL_BYTES = 4096
+ARCSIGHT_DEFAULT_DEBUG_CAPTURE_ACTION_BYTES = 1048576
+
+# Levels of the replies kept in the debug data of an action
+ARCSIGHT_DEBUG_CAPTURE_OFF = "off"
+ARCSIGHT_DEBUG_CAPTURE_SUMMARY = "summary"
+ARCSIGHT_DEBUG_CAPTURE_TRUNCATED = "truncated"
+ARCSIGHT_DEBUG_CAPTURE_FULL = "full"
+ARCSIGHT_DEBUG_CAPTURE_LEVELS = (
+    ARCSIGHT_DEBUG_CAPTURE_OFF,
+    ARCSIGHT_DEBUG_CAPTURE_SUMMARY,
+    ARCSIGHT_DEBUG_CAPTURE_TRUNCATED,
+    ARCSIGHT_DEBUG_CAPTURE_FULL,
+)
+ARCSIGHT_DEFAULT_DEBUG_CAPTURE = ARCSIGHT_DEBUG_CAPTURE_TRUNCATED
+
+# Record and replay of the ESM traffic
+ARCSIGHT_REPLAY_OFF = "off"
+ARCSIGHT_REPLAY_RECORD = "record"
+ARCSIGHT_REPLAY_REPLAY = "replay"
+ARCSIGHT_REPLAY_MODES = (ARCSIGHT_REPLAY_OFF, ARCSIGHT_REPLAY_RECORD, ARCSIGHT_REPLAY_REPLAY)
+ARCSIGHT_REPLAY_FILE = "{asset_id}_replay.jsonl.gz"
+
+# Case fields sent with the changed fields of an update so the manager can identify the case
+ARCSIGHT_CASE_IDENTITY_FIELDS = ("resourceid", "reference", "name", "type", "typeName")
+
+# Case fields that change without the case content changing, left out of the case hash
+ARCSIGHT_CASE_HASH_IGNORED_FIELDS = (
+    "modifiedTimestamp",
+    "modifiedTime",
+    "modificationCount",
+    "modifierName",
+    "inCache",
+    "isAdditionalLoaded",
+    "attributeInitializationInProgress",
+    "initialized",
+)
+
+# Responses of the ESM manager that mean the auth token is no longer valid
+ARCSIGHT_AUTH_ERROR_STATUS_CODES = (401, 403)
+ARCSIGHT_AUTH_ERROR_MARKERS = ("authToken", "AuthenticationException", "InvalidAuthToken", "Login Failure")
+ARCSIGHT_LOGIN_LOCK_FILE = "{asset_id}_login.lock"
+ARCSIGHT_STATE_LOCK_FILE = "{asset_id}_state.lock"
+
+# Read-only calls that are retried on connection errors and on the status codes of an overloaded manager
+ARCSIGHT_IDEMPOTENT_OPERATIONS = (
+    "getESMVersion",
+    "findAllIds",
+    "getResourceById",
+    "getResourcesByIds",
+    "getSecurityEvents",
+    "search",
+    "getGroupByURI",
+    "getChildIDByChildNameOrAlias",
+    "getAllChildren",
+)
+ARCSIGHT_RETRY_STATUS_CODES = (429, 502, 503, 504)
 
 # Constants relating to 'get_error_message_from_exception'
 ERR_CODE_MSG = "Error code unavailable"
@@ -0,0 +1,63 @@
+# File: arcsight_metrics.py
+# Copyright (c) 2017-2026 Splunk Inc.
+#
+# Licensed under Apache 2.0 (https://www.apache.org/licenses/LICENSE-2.0.txt)
+#
+import math
+import threading
+
+
+def _percentile(sorted_values, percent):
+
+    return sorted_values[max(math.ceil(len(sorted_values) * percent / 100) - 1, 0)]
+
+
+class Metrics:
+    """
+    Thread-safe call counts, latencies, payload sizes and errors per operation.
+
+    Recording a call is a dictionary lookup and a list append under a lock, the percentiles are
+    only computed by 'report'.
+    """
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+        self._operations = {}
+
+    def record(self, operation, seconds, bytes_sent=0, bytes_received=0, error=False):
+
+        with self._lock:
+            stats = self._operations.get(operation)
+            if stats is None:
+                stats = self._operations[operation] = {"latencies": [], "errors": 0, "bytes_sent": 0, "bytes_received": 0}
+
+            stats["latencies"].append(seconds)
+            stats["errors"] += error
+            stats["bytes_sent"] += bytes_sent
+            stats["bytes_received"] += bytes_received
+
+    def report(self):
+        """
+        Summarize the recorded calls.
+
+        :return: dictionary of operation to its number of calls and errors, p50, p95 and max latency in milliseconds,
+            and bytes sent and received
+        """
+        with self._lock:
+            operations = {operation: dict(stats, latencies=sorted(stats["latencies"])) for operation, stats in self._operations.items()}
+
+        report = {}
+        for operation, stats in sorted(operations.items()):
+            latencies = stats["latencies"]
+            report[operation] = {
+                "calls": len(latencies),
+                "errors": stats["errors"],
+                "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+                "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+                "max_ms": round(latencies[-1] * 1000, 1),
+                "bytes_sent": stats["bytes_sent"],
+                "bytes_received": stats["bytes_received"],
+            }
+
+        return report
@@ -0,0 +1,89 @@
+# File: arcsight_policy.py
+# Copyright (c) 2017-2026 Splunk Inc.
+#
+# Licensed under Apache 2.0 (https://www.apache.org/licenses/LICENSE-2.0.txt)
+#
+import fcntl
+import json
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Request rate limit shared by every action run of an asset.
+
+    The bucket is kept in a file locked with flock, so concurrent action runs (separate processes)
+    draw from the same 'rate' tokens per second.
+    """
+
+    def __init__(self, path, rate):
+
+        self._path = path
+        self._rate = rate
+        self._capacity = rate
+
+    def reserve(self):
+        """
+        Take a token from the bucket, the bucket may go into debt.
+
+        :return: seconds to wait before the token can be used
+        """
+        with open(self._path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+
+            now = time.time()
+
+            f.seek(0)
+            try:
+                tokens, updated = json.loads(f.read())
+            except (TypeError, ValueError):
+                tokens, updated = self._capacity, now
+
+            tokens = min(self._capacity, tokens + max(now - updated, 0) * self._rate) - 1
+
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps([tokens, now]))
+
+        return max(-tokens / self._rate, 0)
+
+
+class CircuitBreaker:
+    """
+    Fail fast once 'threshold' calls in a row have failed, until 'timeout' seconds have passed.
+
+    After the timeout the calls go through again, the first one to fail opens the circuit again
+    and the first one to succeed closes it.
+    """
+
+    def __init__(self, threshold, timeout, failures=0, open_until=0):
+
+        self._threshold = threshold
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self.failures = failures
+        self.open_until = open_until
+
+    def allow(self):
+
+        return not self._threshold or time.time() >= self.open_until
+
+    def record_success(self):
+
+        with self._lock:
+            self.failures = 0
+            self.open_until = 0
+
+    def record_failure(self):
+        """:return: True if this failure opened the circuit"""
+
+        with self._lock:
+            self.failures += 1
+
+            if not self._threshold or self.failures < self._threshold:
+                return False
+
+            self.open_until = time.time() + self._timeout
+
+            return True
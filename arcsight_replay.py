@@ -0,0 +1,160 @@
+# File: arcsight_replay.py
+# Copyright (c) 2017-2026 Splunk Inc.
+#
+# Licensed under Apache 2.0 (https://www.apache.org/licenses/LICENSE-2.0.txt)
+#
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+
+SCRUBBED = "<scrubbed>"
+
+# request keys whose values are credentials, matched on the end of the key (e.g. 'cas.authToken')
+_SECRET_KEYS = ("authToken", "login", "password")
+# the credentials that are also scrubbed from the replies, the username is too likely to be part of the case and event data
+_REPLY_SECRET_KEYS = ("authToken", "password")
+
+
+def _scrub(value, secrets):
+    """Copy of request parameters or JSON with the credentials replaced, the ones to scrub from the replies are added to 'secrets'."""
+
+    if not isinstance(value, dict):
+        return value
+
+    scrubbed = {}
+    for key, item in value.items():
+        if isinstance(item, dict):
+            scrubbed[key] = _scrub(item, secrets)
+        elif isinstance(item, str) and key.endswith(_SECRET_KEYS):
+            if key.endswith(_REPLY_SECRET_KEYS):
+                secrets.add(item)
+            scrubbed[key] = SCRUBBED
+        else:
+            scrubbed[key] = item
+
+    return scrubbed
+
+
+def _scrub_reply(value, secrets):
+    """Copy of a parsed reply with the string values that are a secret replaced, keys and other strings are kept as they are."""
+
+    if isinstance(value, dict):
+        return {key: _scrub_reply(item, secrets) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_scrub_reply(item, secrets) for item in value]
+    if isinstance(value, str) and value in secrets:
+        return SCRUBBED
+
+    return value
+
+
+def _get_key(method, endpoint, params, json_data):
+
+    return f"{method.lower()} {endpoint} {json.dumps(params, sort_keys=True)} {json.dumps(json_data, sort_keys=True)}"
+
+
+class Recorder:
+    """
+    Append the requests made to the ESM and their replies to a gzip JSON lines file.
+
+    Credentials and auth tokens are scrubbed from the requests, and the string values of the JSON replies
+    that are a password or token seen in the requests, or a token returned by the login, are scrubbed.
+    """
+
+    def __init__(self, path):
+
+        self._path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._secrets = set()
+
+    def record(self, method, endpoint, params, json_data, status_code, content_type, content, seconds):
+
+        with self._lock:
+            params = _scrub(params, self._secrets)
+            json_data = _scrub(json_data, self._secrets)
+
+            body = content.decode(errors="replace")
+
+            # scrub whole values only, a short password could be part of any key or text of the reply
+            try:
+                reply = json.loads(body)
+            except ValueError:
+                reply = None
+
+            if endpoint.endswith("/login") and status_code == 200:
+                try:
+                    self._secrets.add(reply["log.loginResponse"]["log.return"])
+                except (KeyError, TypeError):
+                    pass
+
+            if reply is not None:
+                scrubbed_reply = _scrub_reply(reply, self._secrets)
+                if scrubbed_reply != reply:
+                    body = json.dumps(scrubbed_reply)
+
+            entry = {
+                "method": method.lower(),
+                "endpoint": endpoint,
+                "params": params,
+                "json": json_data,
+                "status": status_code,
+                "content_type": content_type,
+                "body": body,
+                "seconds": round(seconds, 6),
+            }
+
+            if self._file is None:
+                self._file = gzip.open(self._path, "at")
+            self._file.write(f"{json.dumps(entry)}\n")
+
+    def close(self):
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Replayer:
+    """
+    Replies recorded by a Recorder, looked up by method, endpoint and scrubbed request.
+
+    The replies to the same request are returned in the recorded order, the last one is returned again
+    once they run out. With 'timing' set, each reply is delayed by the time the ESM took to send it.
+    """
+
+    def __init__(self, path, timing=False):
+
+        self._timing = timing
+        self._lock = threading.Lock()
+        self._replies = defaultdict(deque)
+
+        with gzip.open(path, "rt") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._replies[_get_key(entry["method"], entry["endpoint"], entry["params"], entry["json"])].append(entry)
+
+    def __len__(self):
+
+        return sum(len(replies) for replies in self._replies.values())
+
+    def reply(self, method, endpoint, params, json_data):
+        """:return: the recorded entry of the request, None if the request was not recorded"""
+
+        key = _get_key(method, endpoint, _scrub(params, set()), _scrub(json_data, set()))
+
+        with self._lock:
+            replies = self._replies.get(key)
+            if not replies:
+                return None
+
+            entry = replies.popleft() if len(replies) > 1 else replies[0]
+
+        if self._timing:
+            time.sleep(entry["seconds"])
+
+        return entry
@@ -0,0 +1,184 @@
+# File: bench_actions.py
+# Copyright (c) 2017-2026 Splunk Inc.
+#
+# Licensed under Apache 2.0 (https://www.apache.org/licenses/LICENSE-2.0.txt)
+#
+"""
+End-to-end benchmark of the connector actions against the mock ESM.
+
+Starts a MockESM (mock_esm.py) and runs each action in its own process, so that the peak RSS of an
+action is not inflated by the ones before it. The actions share one asset, so the later actions see the
+state, caches and auth token the earlier ones left, like the runs of a real asset. With --expire-tokens
+the mock rejects that auth token, so every action goes through the re-login of a rejected token. Reports
+for each action its wall time, the cases and events it got from or wrote to the mock per second, the round
+trips it made and the peak RSS of its process.
+
+The actions run through BaseConnector._handle_action, so this needs the SOAR SDK (phantom), e.g. with
+phenv on a SOAR instance, from the app directory:
+
+    phenv python benchmarks/bench_actions.py --cases 2000 --events-per-case 10 --latency 0.005
+    phenv python benchmarks/bench_actions.py --actions on_poll --config '{"async_transport": true}'
+    phenv python benchmarks/bench_actions.py --actions get_ticket,update_ticket --expire-tokens
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from mock_esm import GROUP_URI, MockESM
+
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ACTIONS = (
+    "test_asset_connectivity",
+    "on_poll",
+    "get_ticket",
+    "update_ticket",
+    "bulk_update_ticket",
+    "create_ticket",
+    "bulk_create_ticket",
+    "run_query",
+)
+
+
+def _get_parameters(action, mock, args):
+
+    case_ids = mock.case_ids[: args.tickets]
+    run_id = f"{os.getpid()}-{int(time.time())}"
+
+    if action == "on_poll":
+        return {"container_count": args.cases, "artifact_count": max(args.events_per_case, 1)}
+    if action == "get_ticket":
+        return {"id": ",".join(case_ids)}
+    if action == "update_ticket":
+        return {"id": case_ids[0], "update_fields": json.dumps({"description": f"Benchmark {run_id}"})}
+    if action == "bulk_update_ticket":
+        return {"ids": ",".join(case_ids), "update_fields": json.dumps({"description": f"Benchmark {run_id}"})}
+    if action == "create_ticket":
+        return {"parent_group": GROUP_URI, "name": f"Benchmark {run_id}"}
+    if action == "bulk_create_ticket":
+        return {"parent_group": GROUP_URI, "names": ",".join(f"Benchmark {run_id} {i}" for i in range(args.tickets))}
+    if action == "run_query":
+        return {"query": "benchmark", "type": "All", "range": f"0-{args.search_hits}", "bypass_cache": True}
+
+    return {}
+
+
+def _run_child(in_json):
+    """Run one action in this process and print its timing and peak RSS as the last line."""
+
+    sys.path.insert(0, APP_DIR)
+
+    from arcsight_connector import ArcsightConnector
+
+    connector = ArcsightConnector()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started = time.perf_counter()
+    ret_val = connector._handle_action(json.dumps(in_json), None)
+    seconds = time.perf_counter() - started
+
+    results = json.loads(ret_val)
+    if isinstance(results, dict):
+        results = [results]
+
+    print(
+        json.dumps(
+            {
+                "seconds": seconds,
+                "status": "success" if all(result.get("status") == "success" for result in results) else "failed",
+                "message": "; ".join(str(result.get("message", "")) for result in results),
+                "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                "rss_before_kb": rss_before,
+            }
+        )
+    )
+
+
+def _run_action(action, mock, config, args):
+
+    in_json = {
+        "action": action,
+        "identifier": action,
+        "asset_id": args.asset_id,
+        "config": config,
+        "parameters": [_get_parameters(action, mock, args)],
+    }
+
+    mock.reset()
+    if args.expire_tokens:
+        mock.expire_tokens()
+
+    child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(in_json)], capture_output=True, text=True)
+
+    try:
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        sys.stderr.write(child.stdout + child.stderr)
+        return {"action": action, "status": "crashed", "message": f"exit code {child.returncode}"}
+
+    stats = mock.stats()
+    seconds = result["seconds"]
+
+    return dict(
+        result,
+        action=action,
+        round_trips=sum(stats["calls"].values()),
+        cases_per_sec=stats["cases"] / seconds if seconds else 0,
+        events_per_sec=stats["events"] / seconds if seconds else 0,
+        calls=stats["calls"],
+    )
+
+
+def main():
+
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        return _run_child(json.loads(sys.argv[2]))
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=500, help="synthetic cases of the mock")
+    parser.add_argument("--events-per-case", type=int, default=10, help="events of each case")
+    parser.add_argument("--search-hits", type=int, default=1000, help="hits of every search")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds the mock sleeps before each reply")
+    parser.add_argument("--jitter", type=float, default=0, help="up to this many more seconds slept before each reply")
+    parser.add_argument("--tickets", type=int, default=50, help="cases read, updated and created by the ticket actions")
+    parser.add_argument("--actions", default=",".join(ACTIONS), help="comma separated actions to run, in order")
+    parser.add_argument("--config", default="{}", help="JSON of asset configuration added to the base_url and credentials")
+    parser.add_argument("--asset-id", default=f"benchmark_{os.getpid()}", help="asset ID, runs with the same ID share the state")
+    parser.add_argument("--expire-tokens", action="store_true", help="reject the auth token cached by the earlier actions")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON lines")
+    args = parser.parse_args()
+
+    mock = MockESM(args.cases, args.events_per_case, args.search_hits, args.latency, args.jitter).start()
+
+    config = {"base_url": mock.url, "username": "benchmark", "password": "benchmark", "verify_server_cert": False}  # pragma: allowlist secret
+    config.update(json.loads(args.config))
+
+    if not args.json:
+        print(f"Mock ESM: {args.cases} cases, {args.events_per_case} events per case, {args.latency * 1000:g} ms latency")
+        print(f"{'action':<25} {'status':<8} {'seconds':>8} {'cases/s':>9} {'events/s':>9} {'trips':>6} {'peak RSS MiB':>13}")
+
+    try:
+        for action in (action.strip() for action in args.actions.split(",") if action.strip()):
+            result = _run_action(action, mock, config, args)
+
+            if args.json:
+                print(json.dumps(result))
+            elif result["status"] == "crashed":
+                print(f"{action:<25} {'crashed':<8} {result['message']}")
+            else:
+                print(
+                    f"{action:<25} {result['status']:<8} {result['seconds']:>8.2f} {result['cases_per_sec']:>9.0f} {result['events_per_sec']:>9.0f}"
+                    f" {result['round_trips']:>6} {result['peak_rss_kb'] / 1024:>13.1f}"
+                )
+    finally:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# File: bench_cef.py
+# Copyright (c) 2017-2026 Splunk Inc.
+#
+# Licensed under Apache 2.0 (https://www.apache.org/licenses/LICENSE-2.0.txt)
+#
+"""
+Events per second of the event-to-CEF mapping and of the artifact construction of on poll.
+
+Times '_event_to_cef' and '_get_artifact' on the synthetic events of the mock ESM (mock_esm.make_event),
+on one core, against the hand-written source and destination mapping that the mapping table replaced
+(the 'former' columns, with its uncached converters). The conversion caches are cleared before each run,
+the events repeat addresses, ports and host names like the events of a real case do, and their times
+are all different.
+
+The table maps the agent, device, file and request fields too, so it fills more CEF keys per event than
+the former mapping, the CEF mapping is compared in CEF keys per second. The goals are ratios to the former
+mapping, so that they do not depend on the machine: the artifact construction, which is what a poll pays
+per event, and the CEF mapping per key at least as fast as the former mapping (1.0x). Pass --goal to fail
+(exit code 1) when a variant is below its goal.
+
+Importing the connector needs the SOAR SDK (phantom), run it from the app directory:
+
+    python benchmarks/bench_cef.py --events 100000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+from mock_esm import make_event
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arcsight_connector
+
+
+# ratio to the former mapping that each variant is expected to reach
+GOALS = {"CEF mapping": 1.0, "artifact construction": 1.0}
+
+
+# the former mapping called the converters without a cache
+_to_ip = arcsight_connector._to_ip.__wrapped__
+_to_mac = arcsight_connector._to_mac.__wrapped__
+_to_port = arcsight_connector._to_port.__wrapped__
+_get_str_from_epoch = arcsight_connector._get_str_from_epoch.__wrapped__
+
+
+def _former_cef(event):
+    """The source and destination mapping the table replaced, with its filter-and-rebuild pass."""
+
+    cef = {}
+
+    # source details
+    source = event.get("source")
+    if source:
+        cef["sourceUserName"] = source.get("userName")
+        cef["sourceAddress"] = _to_ip(source.get("address"))
+        cef["sourceMacAddress"] = _to_mac(source.get("maxAddress"))
+        cef["sourcePort"] = _to_port(source.get("port"))
+        cef["sourceHostName"] = source.get("hostName")
+
+    # destination details
+    destination = event.get("destination")
+    if destination:
+        cef["destinationUserName"] = destination.get("userName")
+        cef["destinationAddress"] = _to_ip(destination.get("address"))
+        cef["destinationMacAddress"] = _to_mac(destination.get("maxAddress"))
+        cef["destinationPort"] = _to_port(destination.get("port"))
+        cef["destinationHostName"] = destination.get("hostName")
+
+    return {k: v for k, v in list(cef.items()) if v}
+
+
+def _clear_caches():
+
+    for converter in (
+        arcsight_connector._to_ip,
+        arcsight_connector._to_mac,
+        arcsight_connector._to_port,
+        arcsight_connector._get_str_from_epoch,
+    ):
+        converter.cache_clear()
+
+
+def _measure(funcs, events, repeat):
+    """Events per second of each function, the runs of the functions alternate so that they see the same machine load."""
+
+    best = [None] * len(funcs)
+    for _ in range(repeat):
+        for i, func in enumerate(funcs):
+            _clear_caches()
+            gc.collect()
+            started = time.perf_counter()
+            for j, event in enumerate(events):
+                func(j, event)
+            seconds = time.perf_counter() - started
+            best[i] = seconds if best[i] is None else min(best[i], seconds)
+
+    return [len(events) / seconds for seconds in best]
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=100000, help="events mapped per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per variant, the fastest is reported")
+    parser.add_argument("--goal", action="store_true", help="exit with 1 when a variant misses its goal")
+    args = parser.parse_args()
+
+    events = [make_event(i) for i in range(args.events)]
+
+    connector = arcsight_connector.ArcsightConnector()
+
+    def former_artifact(i, event):
+        connector.send_progress("Processing Event ID: {}".format(event["eventId"]))
+        return {
+            "source_data_identifier": event["eventId"],
+            "name": event.get("name", f"Artifact # {i}"),
+            "data": event,
+            "start_time": _get_str_from_epoch(event.get("startTime")),
+            "end_time": _get_str_from_epoch(event.get("endTime")),
+            "cef": _former_cef(event),
+        }
+
+    former_keys = sum(len(_former_cef(event)) for event in events) / len(events)
+    table_keys = sum(len(arcsight_connector._event_to_cef(event)) for event in events) / len(events)
+
+    # variant, unit, former and table functions, the units per event of the former and of the table
+    variants = (
+        (
+            "CEF mapping",
+            "keys/s",
+            lambda i, event: _former_cef(event),
+            lambda i, event: arcsight_connector._event_to_cef(event),
+            former_keys,
+            table_keys,
+        ),
+        ("artifact construction", "events/s", former_artifact, connector._get_artifact, 1, 1),
+    )
+
+    print(f"{args.events} mock events, fastest of {args.repeat} runs, {former_keys:.1f} former and {table_keys:.1f} table CEF keys per event")
+    print(f"{'variant':<25} {'unit':<8} {'former':>12} {'table':>12} {'ratio':>6} {'goal':>6}")
+
+    missed = False
+    for name, unit, former, table, former_per_event, table_per_event in variants:
+        former_rate, table_rate = _measure((former, table), events, args.repeat)
+        former_rate *= former_per_event
+        table_rate *= table_per_event
+        ratio = table_rate / former_rate
+        missed = missed or ratio < GOALS[name]
+        print(f"{name:<25} {unit:<8} {former_rate:>12,.0f} {table_rate:>12,.0f} {ratio:>5.2f}x {GOALS[name]:>5.2f}x")
+
+    if args.goal and missed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
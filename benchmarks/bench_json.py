@@ -0,0 +1,111 @@
+# File: bench_json.py
+# Copyright (c) 2017-2026 Splunk Inc.
+#
+# Licensed under Apache 2.0 (https://www.apache.org/licenses/LICENSE-2.0.txt)
+#
+"""
+Parse time and peak memory of a large getSecurityEvents reply.
+
+Compares the former handling of a reply (decode 'response.text' for the debug data, then 'response.json()'
+decodes and parses it again) with the single pass of '_loads' on the raw bytes, with orjson when it is
+installed and with the stdlib parser.
+
+Importing the connector needs the SOAR SDK (phantom), run it from the app directory:
+
+    python benchmarks/bench_json.py --events 5000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import requests
+from mock_esm import make_event
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arcsight_connector
+
+
+def _make_response(events, content_type):
+
+    response = requests.models.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = content_type
+    response._content = json.dumps({"sev.getSecurityEventsResponse": {"sev.return": [make_event(i) for i in range(events)]}}).encode()
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+
+    return response
+
+
+def _two_pass(response):
+
+    debug_data = [response.text]
+
+    return response.json(), debug_data
+
+
+def _single_pass(loads):
+
+    def parse(response):
+
+        content = response.content
+        debug_data = [content[:4096].decode(errors="replace")]
+
+        return loads(content), debug_data
+
+    return parse
+
+
+def _measure(parse, response, repeat):
+
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parse(response)
+    seconds = (time.perf_counter() - started) / repeat
+
+    gc.collect()
+    tracemalloc.start()
+    parse(response)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return seconds, peak
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=5000, help="events in the reply")
+    parser.add_argument("--repeat", type=int, default=10, help="parses timed per variant")
+    parser.add_argument("--content-type", default="application/json", help="Content-Type header of the reply")
+    args = parser.parse_args()
+
+    response = _make_response(args.events, args.content_type)
+
+    variants = [("two pass (response.text + response.json())", _two_pass), ("single pass, stdlib json", _single_pass(json.loads))]
+    if arcsight_connector.orjson is not None:
+        variants.append(("single pass, orjson", _single_pass(arcsight_connector._loads)))
+    else:
+        print("orjson is not installed, '_loads' uses the stdlib parser")
+
+    print(f"getSecurityEvents reply: {args.events} events, {len(response.content) / 1048576:.1f} MiB, Content-Type: {args.content_type}")
+    print(f"{'variant':<45} {'parse ms':>10} {'peak MiB':>10}")
+
+    baseline = None
+    for name, parse in variants:
+        seconds, peak = _measure(parse, response, args.repeat)
+        baseline = baseline or (seconds, peak)
+        print(
+            f"{name:<45} {seconds * 1000:>10.1f} {peak / 1048576:>10.1f}   ({baseline[0] / seconds:.1f}x time, {baseline[1] / peak:.1f}x memory)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+# File: mock_esm.py
+# Copyright (c) 2017-2026 Splunk Inc.
+#
+# Licensed under Apache 2.0 (https://www.apache.org/licenses/LICENSE-2.0.txt)
+#
+"""
+Local stand-in for the ArcSight ESM REST API, with synthetic cases and events.
+
+Serves the endpoints the connector uses: LoginService/login, CaseService (getESMVersion, findAllIds,
+getResourceById, getResourcesByIds, insertResource, update), SecurityEventService/getSecurityEvents,
+GroupService (getGroupByURI, getChildIDByChildNameOrAlias, getAllChildren) and ManagerSearchService/search.
+Every reply can be delayed to stand in for the network and the ESM. GET /mock/stats returns the calls per
+operation and the cases and events served, POST /mock/reset clears them and POST /mock/expire rejects the
+auth tokens given so far, like a restarted manager.
+
+Only needs the standard library:
+
+    python benchmarks/mock_esm.py --cases 1000 --events-per-case 20 --latency 0.01 --port 8080
+
+then point the base_url of an asset at http://127.0.0.1:8080 with any username and password.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+ESM_VERSION = "7.6.0.2651.0"
+GROUP_URI = "/All Cases/All Cases"
+GROUP_ID = "7Ed4x4AABABCAA1NEk4zM5w=="
+# the error page of a call made with an unknown or expired auth token
+AUTH_ERROR = "com.arcsight.coma.AuthenticationException: Login Failure, the authToken is not valid"
+
+
+def make_event(event_id):
+    """A security event shaped like the ones getSecurityEvents returns."""
+
+    return {
+        "eventId": event_id,
+        "name": f"Attempted login failure {event_id}",
+        "type": "BASE",
+        "baseEventCount": 1,
+        "startTime": 1700000000000 + event_id,
+        "endTime": 1700000000000 + event_id,
+        "managerReceiptTime": 1700000000500 + event_id,
+        "agentReceiptTime": 1700000000400 + event_id,
+        "priority": 5,
+        "deviceEventClassId": "4625",
+        "deviceProduct": "Microsoft Windows",
+        "deviceVendor": "Microsoft",
+        "deviceVersion": "10.0",
+        "severity": 3,
+        "category": {"behavior": "/Authentication/Verify", "outcome": "/Failure", "significance": "/Suspicious", "technique": "/Brute Force"},
+        "source": {
+            "address": 167772161 + event_id % 65536,
+            "hostName": f"workstation-{event_id % 1000}.example.com",
+            "port": 49152 + event_id % 16384,
+            "macAddress": 18838586676582,
+            "userName": f"user{event_id % 500}",
+            "geo": {"latitude": 37.39, "longitude": -121.96, "countryCode": "US", "regionCode": "CA", "postalCode": "95054"},
+        },
+        "destination": {
+            "address": 167772162,
+            "hostName": "dc01.example.com",
+            "port": 445,
+            "userName": "Administrator",
+            "processName": "lsass.exe",
+        },
+        "agent": {"address": 167772170, "hostName": "connector01.example.com", "id": "3Xd2LnIQBABCAA1sGvx2Ntg==", "type": "winc"},
+        "message": "An account failed to log on. Failure reason: unknown user name or bad password.",
+        "rawEvent": "x" * 256,
+    }
+
+
+def _make_case(index, event_ids):
+
+    return {
+        "resourceid": f"case-{index:06d}",
+        "name": f"Case {index}",
+        "description": f"Synthetic case {index}",
+        "stage": "QUEUED",
+        "consequenceSeverity": "NONE",
+        "createdTimestamp": 1700000000000 + index,
+        "modifiedTimestamp": 1700000000000 + index,
+        "eventIDs": event_ids,
+    }
+
+
+class MockESM:
+    """
+    The data and counters of the mock, served by a threading HTTP server.
+
+    'latency' seconds (plus up to 'jitter' seconds) are slept before each reply.
+    """
+
+    def __init__(self, cases=100, events_per_case=10, search_hits=1000, latency=0, jitter=0, host="127.0.0.1", port=0):
+
+        self.latency = latency
+        self.jitter = jitter
+        self.search_hits = search_hits
+        self.calls = Counter()
+        self.cases_served = 0
+        self.events_served = 0
+
+        self._lock = threading.Lock()
+        self._tokens = set()
+        self._cases = {}
+        for index in range(cases):
+            case = _make_case(index, list(range(index * events_per_case, (index + 1) * events_per_case)))
+            self._cases[case["resourceid"]] = case
+        self._children = {GROUP_ID: {case["name"]: case_id for case_id, case in self._cases.items()}}
+
+        self._server = _Server((host, port), _Handler)
+        self._server.mock = self
+        self._thread = None
+
+    @property
+    def url(self):
+
+        host, port = self._server.server_address[:2]
+
+        return f"http://{host}:{port}"
+
+    @property
+    def case_ids(self):
+
+        return list(self._cases)
+
+    def start(self):
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self):
+
+        with self._lock:
+            return {"calls": dict(self.calls), "cases": self.cases_served, "events": self.events_served}
+
+    def reset(self):
+
+        with self._lock:
+            self.calls.clear()
+            self.cases_served = 0
+            self.events_served = 0
+
+    def expire_tokens(self):
+
+        with self._lock:
+            self._tokens.clear()
+
+    def _serve_cases(self, cases):
+
+        with self._lock:
+            self.cases_served += len(cases)
+
+        return cases
+
+    def handle(self, operation, request):
+        """:return: HTTP status, reply dictionary (error text or None for an error page)"""
+
+        with self._lock:
+            self.calls[operation] += 1
+
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if operation == "login":
+            token = f"token-{random.getrandbits(64):016x}"
+            with self._lock:
+                self._tokens.add(token)
+            return 200, {"log.loginResponse": {"log.return": token}}
+
+        token = request.get("authToken") or next((value for key, value in request.items() if key.endswith(".authToken")), None)
+        if token not in self._tokens:
+            return 500, AUTH_ERROR
+
+        if operation == "getESMVersion":
+            return 200, {"cas.getESMVersionResponse": {"cas.return": ESM_VERSION}}
+
+        if operation == "findAllIds":
+            return 200, {"cas.findAllIdsResponse": {"cas.return": list(self._cases)}}
+
+        if operation == "getResourceById":
+            case = self._cases.get(request.get("resourceId"))
+            return 200, {"cas.getResourceByIdResponse": {"cas.return": self._serve_cases([case])[0] if case else {}}}
+
+        if operation == "getResourcesByIds":
+            cases = [self._cases[case_id] for case_id in request["cas.ids"] if case_id in self._cases]
+            return 200, {"cas.getResourcesByIdsResponse": {"cas.return": self._serve_cases(cases)}}
+
+        if operation == "insertResource":
+            with self._lock:
+                case = _make_case(len(self._cases), [])
+                case.update(request["cas.resource"])
+                self._cases[case["resourceid"]] = case
+                self._children.setdefault(request["cas.parentId"], {})[case["name"]] = case["resourceid"]
+            return 200, {"cas.insertResourceResponse": {"cas.return": self._serve_cases([case])[0]}}
+
+        if operation == "update":
+            resource = request["cas.resource"]
+            # the resource replaces the stored case, fields left out of it are lost, as nothing shows the ESM merges them
+            with self._lock:
+                if resource.get("resourceid") not in self._cases:
+                    return 500, None
+                case = dict(resource, modifiedTimestamp=int(time.time() * 1000))
+                self._cases[case["resourceid"]] = case
+            return 200, {"cas.updateResponse": {"cas.return": self._serve_cases([case])[0]}}
+
+        if operation == "getSecurityEvents":
+            event_ids = request["sev.ids"]
+            if not isinstance(event_ids, list):
+                event_ids = [event_ids]
+            events = [make_event(int(event_id)) for event_id in event_ids]
+            with self._lock:
+                self.events_served += len(events)
+            return 200, {"sev.getSecurityEventsResponse": {"sev.return": events}}
+
+        if operation == "getGroupByURI":
+            return 200, {"gro.getGroupByURIResponse": {"gro.return": {"resourceid": GROUP_ID, "uri": request["gro.uri"]}}}
+
+        if operation == "getChildIDByChildNameOrAlias":
+            child_id = self._children.get(request["gro.groupId"], {}).get(request["gro.name"])
+            # like the ESM, the reply holds no dictionary when there is no such child
+            return 200, {"gro.getChildIDByChildNameOrAliasResponse": {"gro.return": child_id} if child_id else ""}
+
+        if operation == "getAllChildren":
+            children = self._children.get(request["gro.groupId"], {})
+            return 200, {
+                "gro.getAllChildrenResponse": {"gro.return": [{"name": name, "resourceid": child_id} for name, child_id in children.items()]}
+            }
+
+        if operation == "search":
+            start, page_size = int(request["mss.startPosition"]), int(request["mss.pageSize"])
+            hits = [
+                {"name": f"Hit {i}", "uuid": f"hit-{i:08d}", "uri": f"/All Cases/Hit {i}", "type": 1, "score": 1.0}
+                for i in range(start, min(start + page_size, self.search_hits))
+            ]
+            return 200, {"mss.searchResponse": {"mss.return": {"hitCount": self.search_hits, "searchHits": hits, "elapsed": 1}}}
+
+        return 404, None
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # the connector opens many connections at once with the async transport
+    request_queue_size = 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+
+        pass
+
+    def _reply(self, status, reply, content_type="application/json"):
+
+        # an error is an HTML page with the reason in a <pre> element
+        if reply is None or isinstance(reply, str):
+            body = f"<html><body><pre>{reply or f'Error {status}'}</pre></body></html>".encode()
+            content_type = "text/html"
+        else:
+            body = json.dumps(reply).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+
+        url = urlparse(self.path)
+
+        if url.path == "/mock/stats":
+            return self._reply(200, self.server.mock.stats())
+
+        request = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        self._reply(*self.server.mock.handle(url.path.rsplit("/", 1)[-1], request))
+
+    def do_POST(self):
+
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if url.path == "/mock/reset":
+            self.server.mock.reset()
+            return self._reply(200, {})
+
+        if url.path == "/mock/expire":
+            self.server.mock.expire_tokens()
+            return self._reply(200, {})
+
+        try:
+            request = next(iter(json.loads(body).values()))
+        except (ValueError, StopIteration, AttributeError):
+            return self._reply(400, None)
+
+        self._reply(*self.server.mock.handle(url.path.rsplit("/", 1)[-1], request))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cases", type=int, default=100, help="synthetic cases")
+    parser.add_argument("--events-per-case", type=int, default=10, help="events of each case")
+    parser.add_argument("--search-hits", type=int, default=1000, help="hits of every search")
+    parser.add_argument("--latency", type=float, default=0, help="seconds slept before each reply")
+    parser.add_argument("--jitter", type=float, default=0, help="up to this many more seconds slept before each reply")
+    args = parser.parse_args()
+
+    mock = MockESM(args.cases, args.events_per_case, args.search_hits, args.latency, args.jitter, args.host, args.port)
+
+    print(f"Mock ESM with {args.cases} cases listening on {mock.url}", flush=True)
+
+    try:
+        mock._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()